@@ -1,12 +1,16 @@
+import importlib
 import logging
+from typing import TYPE_CHECKING
 
-from .base_client import LSPProtocolError
+from .base_client import LSPProtocolError, LSPResponseError
 from .utils import DocumentContentChange, SemanticTokenProcessor
 from .single_file_client import SingleFileClient
 from .client import LeanLSPClient
-from .pool import LeanClientPool
 from .file_manager import DiagnosticsResult
 
+if TYPE_CHECKING:
+    from .pool import LeanClientPool
+
 __all__ = [
     "DiagnosticsResult",
     "DocumentContentChange",
@@ -15,7 +19,24 @@ __all__ = [
     "LeanLSPClient",
     "LeanClientPool",
     "LSPProtocolError",
+    "LSPResponseError",
 ]
 
+# Imported on first access: the pool pulls in multiprocessing and tqdm.
+_LAZY = {"LeanClientPool": ".pool"}
+
+
+def __getattr__(name: str):
+    if name in _LAZY:
+        value = getattr(importlib.import_module(_LAZY[name], __name__), name)
+        globals()[name] = value
+        return value
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
+
+
 # Configure default logging (users can override)
 logging.getLogger(__name__).addHandler(logging.NullHandler())
@@ -27,6 +27,7 @@ from .errors import (
     LeanUnsupportedVersion,
     LeanWorkerCrashed,
 )
+from .pool import LeanServerPool
 from .scratch import ScratchPool, TrialResult
 
 __all__ = [
@@ -35,6 +36,7 @@ __all__ = [
     "GoalResult",
     "DocState",
     "DocStatus",
+    "LeanServerPool",
     "ScratchPool",
     "TrialResult",
     "LeanClientError",
@@ -27,23 +27,29 @@ from __future__ import annotations
 
 import asyncio
 import contextlib
+import functools
 import os
 import re
 import time
+from collections import OrderedDict
+from collections.abc import Awaitable, Callable
 from dataclasses import dataclass, field
 from pathlib import Path
-from typing import Literal, Optional, cast
+from typing import Any, Literal, Optional, cast
 from urllib.parse import urlparse
 from urllib.request import url2pathname
 
+import orjson
+
 from .convert import (
-    codepoint_to_utf16,
+    position_to_utf16,
     range_from_utf16,
 )
 from .document import DocState, DocStatus
 from .errors import (
     LeanClientError,
     LeanFileNotOpen,
+    LeanRequestCancelled,
     LeanRequestTimeout,
     LeanRpcError,
     LeanUnsupportedVersion,
@@ -56,6 +62,56 @@ MIN_LEAN_VERSION = (4, 24)
 # Lean-specific error codes (Lean.Data.Lsp.Utf16 / Watchdog)
 _WORKER_ERROR_CODES = {-32901, -32902}  # workerExited, workerCrashed
 _CONTENT_MODIFIED = -32801
+# Shared, never-mutated request fragment (1 = Invoked).
+_COMPLETION_CONTEXT = {"context": {"triggerKind": 1}}
+# Position queries whose answer depends only on (document version, position)
+# once the version is fully elaborated; safe to serve from the response cache.
+_CACHEABLE_METHODS = frozenset(
+    {
+        "textDocument/hover",
+        "textDocument/definition",
+        "textDocument/declaration",
+        "textDocument/typeDefinition",
+        "$/lean/plainGoal",
+        "$/lean/plainTermGoal",
+    }
+)
+# Position queries answering with Location / LocationLink results.
+_LOCATION_METHODS = frozenset(
+    {
+        "textDocument/definition",
+        "textDocument/declaration",
+        "textDocument/typeDefinition",
+        "textDocument/implementation",
+        "textDocument/references",
+    }
+)
+
+
+# Per-document notifications, dispatched to the DocState for their uri.
+_DOC_NOTIFICATION_HANDLERS: dict[str, Callable[[DocState, dict], None]] = {
+    "textDocument/publishDiagnostics": DocState.on_publish_diagnostics,
+    "$/lean/fileProgress": DocState.on_file_progress,
+    "$/lean/staleDependency": lambda doc, _params: doc.on_stale_dependency(),
+}
+
+
+def _unedited_prefix(old: list[str], new: list[str]) -> int:
+    """Number of leading lines whose cached answers survive an edit.
+
+    Lean elaborates top-down and only refers backwards, so positions above the
+    edit are unaffected — except inside the command being edited (a hover on
+    ``def foo :`` can show a type inferred from the body below). The prefix
+    is therefore cut at the last blank line before the first changed line.
+    """
+    first = next(
+        (i for i, (a, b) in enumerate(zip(old, new)) if a != b),
+        min(len(old), len(new)),
+    )
+    for i in range(first - 1, -1, -1):
+        if not new[i].strip():
+            return i
+    return 0
 
 
 def _as_dict_list(value: object) -> list[dict]:
@@ -107,6 +163,39 @@ class DiagnosticsReport:
         return bool(self.errors)
 
 
+@dataclass(slots=True)
+class _SharedBarrier:
+    """A waitForDiagnostics request joined by every caller of one version."""
+
+    version: int
+    task: asyncio.Task
+    waiters: int = 0
+
+
+@dataclass(slots=True)
+class _SharedRequest:
+    """A position request awaited by every concurrent identical caller."""
+
+    task: asyncio.Future
+    waiters: int = 0
+    joined: bool = False
+    data: Optional[bytes] = None
+
+
+@functools.lru_cache(maxsize=4096)
+def _uri_to_relpath(project_path: str, uri: str) -> str:
+    """Project-relative path for ``uri`` (absolute if outside the project).
+
+    Memoized: location-heavy results (goto, references) repeat a handful of
+    URIs, and unquoting plus relpath computation dominates their conversion.
+    """
+    local = url2pathname(urlparse(uri).path)
+    try:
+        return str(Path(local).relative_to(project_path))
+    except ValueError:
+        return local
+
+
 def _default_max_workers() -> int:
     try:
         with open("/proc/meminfo") as f:
@@ -139,6 +228,9 @@ class AsyncLeanLSPClient:
         check_version: bool = True,
         server_command: Optional[list[str]] = None,
         report_delay_ms: Optional[int] = 0,
+        response_cache_size: int = 512,
+        debounce_ms: int = 0,
+        reuse_unedited_responses: bool = False,
     ):
         self.project_path = str(Path(project_path).resolve())
         self.max_workers = max_workers or _default_max_workers()
@@ -158,6 +250,21 @@ class AsyncLeanLSPClient:
         self._docs_by_uri: dict[str, DocState] = {}
         self._open_lock = asyncio.Lock()
         self._rpc_sessions: dict[str, tuple[str, float]] = {}
+        # In-flight barrier per uri, shared by callers of the same version.
+        self._barriers: dict[str, _SharedBarrier] = {}
+        self._pending_changes: dict[str, asyncio.TimerHandle] = {}
+        # LRU of serialized responses for settled versions (0 disables).
+        self.response_cache_size = response_cache_size
+        self._response_cache: OrderedDict[tuple, bytes] = OrderedDict()
+        self._inflight: dict[tuple, _SharedRequest] = {}
+        # Opt-in: on didChange, re-key cached answers above the edit to the
+        # new version instead of dropping them (see _unedited_prefix).
+        self.reuse_unedited_responses = reuse_unedited_responses
+        self._cached_lines: dict[str, tuple[int, list[str]]] = {}
+        # Cursor-driven queries (hover, completions) wait this long and are
+        # dropped if a newer one for the same file arrives meanwhile.
+        self.debounce_ms = debounce_ms
+        self._debounce_waiters: dict[tuple[str, str], asyncio.Future] = {}
         self._started = False
 
     # -- lifecycle -----------------------------------------------------------
@@ -250,6 +357,16 @@ class AsyncLeanLSPClient:
         await self._transport.close()
         self._docs.clear()
         self._docs_by_uri.clear()
+        self._barriers.clear()
+        for pending in self._pending_changes.values():
+            pending.cancel()
+        self._pending_changes.clear()
+        self._response_cache.clear()
+        self._cached_lines.clear()
+        self._inflight.clear()
+        for waiter in self._debounce_waiters.values():
+            waiter.cancel()
+        self._debounce_waiters.clear()
 
     @property
     def alive(self) -> bool:
@@ -268,11 +385,7 @@ class AsyncLeanLSPClient:
         return url2pathname(urlparse(uri).path)
 
     def _uri_to_relpath(self, uri: str) -> str:
-        local = self._uri_to_abs(uri)
-        try:
-            return str(Path(local).relative_to(self.project_path))
-        except ValueError:
-            return local
+        return _uri_to_relpath(self.project_path, uri)
 
     def _doc(self, path: str) -> DocState:
         doc = self._docs.get(path)
@@ -289,20 +402,17 @@ class AsyncLeanLSPClient:
     # -- notification intake ---------------------------------------------
 
     def _on_notification(self, method: str, params: dict) -> None:
+        handler = _DOC_NOTIFICATION_HANDLERS.get(method)
+        if handler is None:
+            return
         uri = None
         if "uri" in params:
             uri = params["uri"]
         elif "textDocument" in params:
             uri = params["textDocument"].get("uri")
         doc = self._docs_by_uri.get(uri) if uri else None
-        if doc is None:
-            return
-        if method == "textDocument/publishDiagnostics":
-            doc.on_publish_diagnostics(params)
-        elif method == "$/lean/fileProgress":
-            doc.on_file_progress(params)
-        elif method == "$/lean/staleDependency":
-            doc.on_stale_dependency()
+        if doc is not None:
+            handler(doc, params)
 
     # -- open/close/update -----------------------------------------------
 
@@ -331,56 +441,115 @@ class AsyncLeanLSPClient:
             existing.touch()
             return existing
 
-        async with self._open_lock:
-            await self._evict_if_needed()
-            virtual = text is not None
-            if text is None:
-                text = (Path(self.project_path) / path).read_text(encoding="utf-8")
-            doc = DocState(
-                path=path,
-                uri=self._path_to_uri(path),
-                text=text,
-                virtual=virtual,
-            )
-            self._docs[path] = doc
-            self._docs_by_uri[doc.uri] = doc
-            await self._transport.notify(
-                "textDocument/didOpen",
-                {
-                    "textDocument": {
-                        "uri": doc.uri,
-                        "languageId": "lean4",
-                        "version": doc.version,
-                        "text": doc.text,
-                    },
-                    "dependencyBuildMode": dependency_build_mode,
-                },
+        virtual = text is not None
+        if text is None:
+            # Read off the event loop so other queries keep flowing meanwhile.
+            text = await asyncio.to_thread(
+                (Path(self.project_path) / path).read_text, encoding="utf-8"
             )
-            doc.status = DocStatus.LIVE
+        async with self._open_lock:
+            doc = self._docs.get(path)
+            if doc is None or doc.status is DocStatus.CLOSED:
+                doc = await self._open_locked(
+                    path, text, virtual, dependency_build_mode
+                )
         if wait:
             await self.barrier(path)
         return doc
 
+    async def _open_locked(
+        self, path: str, text: str, virtual: bool, dependency_build_mode: str
+    ) -> DocState:
+        await self._evict_if_needed()
+        doc = DocState(
+            path=path,
+            uri=self._path_to_uri(path),
+            text=text,
+            virtual=virtual,
+        )
+        self._docs[path] = doc
+        self._docs_by_uri[doc.uri] = doc
+        await self._transport.notify(
+            "textDocument/didOpen",
+            {
+                "textDocument": {
+                    "uri": doc.uri,
+                    "languageId": "lean4",
+                    "version": doc.version,
+                    "text": doc.text,
+                },
+                "dependencyBuildMode": dependency_build_mode,
+            },
+        )
+        doc.status = DocStatus.LIVE
+        return doc
+
     async def open_many(self, paths: list[str], wait: bool = True) -> list[DocState]:
-        """Open several files at once — elaboration runs in parallel workers."""
-        docs = [await self.open(p, wait=False) for p in paths]
+        """Open several files at once — elaboration runs in parallel workers.
+
+        Files are read from disk concurrently.
+        """
+        docs = list(await asyncio.gather(*(self.open(p, wait=False) for p in paths)))
         if wait:
             await asyncio.gather(*(self.barrier(p) for p in paths))
         return docs
 
-    async def update(self, path: str, text: str, wait: bool = False) -> DocState:
+    async def update(
+        self, path: str, text: str, wait: bool = False, debounce_ms: int = 0
+    ) -> DocState:
         """Replace the document text (full-text didChange).
 
         The server reuses snapshots for the unchanged prefix, so this is the
         right primitive even for single-line edits.
+
+        With ``debounce_ms > 0`` (and ``wait=False``) the text is updated
+        locally and the didChange is deferred until no further update arrives
+        for ``debounce_ms``: a burst of keystroke-rate edits costs the server
+        one re-elaboration. Any query on the file flushes a pending change
+        first.
         """
         doc = self._doc(path)
         doc.replace_text(text)
+        if debounce_ms > 0 and not wait:
+            self._cancel_pending_change(path)
+            self._pending_changes[path] = asyncio.get_running_loop().call_later(
+                debounce_ms / 1000, self._schedule_flush, path
+            )
+            doc.touch()
+            return doc
+        self._cancel_pending_change(path)
+        await self._send_change(doc)
+        if wait:
+            await self.barrier(path)
+        return doc
+
+    def _cancel_pending_change(self, path: str) -> bool:
+        pending = self._pending_changes.pop(path, None)
+        if pending is None:
+            return False
+        pending.cancel()
+        return True
+
+    def _schedule_flush(self, path: str) -> None:
+        task = asyncio.ensure_future(self._flush_change(path))
+        # Nobody awaits this task; retrieve a transport-death error here.
+        task.add_done_callback(lambda t: t.cancelled() or t.exception())
+
+    async def _flush_change(self, path: str) -> None:
+        """Send a debounced didChange now, if one is pending for ``path``."""
+        if self._cancel_pending_change(path):
+            doc = self._docs.get(path)
+            if doc is not None:
+                await self._send_change(doc)
+
+    async def _send_change(self, doc: DocState) -> None:
+        text = doc.text
         doc.version += 1
         doc.diagnostics_version = None
         doc.fatal_error = False
         doc.status = DocStatus.LIVE  # didChange also revives a crashed worker
         doc.touch()
+        self._carry_over_responses(doc)
         await self._transport.notify(
             "textDocument/didChange",
             {
@@ -388,9 +557,6 @@ class AsyncLeanLSPClient:
                 "contentChanges": [{"text": text}],
             },
         )
-        if wait:
-            await self.barrier(path)
-        return doc
 
     async def reload_from_disk(self, path: str, wait: bool = False) -> DocState:
         """Sync the document with the file's current on-disk content."""
@@ -405,17 +571,24 @@ class AsyncLeanLSPClient:
         return doc
 
     async def close_file(self, path: str) -> None:
+        self._cancel_pending_change(path)
         doc = self._docs.pop(path, None)
         if doc is None:
             return
         self._docs_by_uri.pop(doc.uri, None)
         self._rpc_sessions.pop(doc.uri, None)
+        self._barriers.pop(doc.uri, None)
+        self._drop_cached_responses(doc.uri)
         doc.status = DocStatus.CLOSED
         with contextlib.suppress(LeanClientError):
             await self._transport.notify(
                 "textDocument/didClose", {"textDocument": {"uri": doc.uri}}
             )
 
+    async def close_many(self, paths: list[str]) -> None:
+        """Close several files; their didClose notifications share one write."""
+        await asyncio.gather(*(self.close_file(p) for p in paths))
+
     async def restart_file(self, path: str, wait: bool = True) -> DocState:
         """didClose + didOpen — picks up rebuilt imports (staleDependency)."""
         doc = self._docs.get(path)
@@ -449,9 +622,11 @@ class AsyncLeanLSPClient:
 
         Sent strictly after the didOpen/didChange it refers to (this client
         owns write ordering). After ``barrier()`` returns, position queries
-        and diagnostics reflect the current text.
+        and diagnostics reflect the current text. Concurrent callers for the
+        same version share one server request.
         """
         doc = self._doc(path)
+        await self._flush_change(path)
         if doc.status is DocStatus.CRASHED:
             # Watchdog contract: only didChange revives a crashed worker.
             await self.update(path, doc.text, wait=False)
@@ -459,12 +634,54 @@ class AsyncLeanLSPClient:
         if doc.barrier_version is not None and doc.barrier_version >= requested_version:
             doc.touch()
             return
+        shared = self._barriers.get(doc.uri)
+        if shared is None or shared.version != requested_version:
+            # The shared wait runs on the client deadline; each caller applies
+            # its own ``timeout`` below, so joiners don't inherit the first one.
+            task = asyncio.ensure_future(self._wait_for_version(doc, requested_version))
+            shared = _SharedBarrier(requested_version, task)
+            self._barriers[doc.uri] = shared
+            task.add_done_callback(lambda t, uri=doc.uri: self._barrier_done(uri, t))
+        shared.waiters += 1
+        try:
+            # Shielded: one caller giving up must not cancel the shared wait;
+            # the last one out cancels it (and the server-side request).
+            await asyncio.wait_for(asyncio.shield(shared.task), timeout)
+        except asyncio.TimeoutError:
+            if shared.waiters == 1:
+                self._cancel_barrier(doc.uri, shared)
+            raise LeanRequestTimeout(
+                f"barrier for {path} timed out after {timeout}s"
+            ) from None
+        except asyncio.CancelledError:
+            if shared.waiters == 1:
+                self._cancel_barrier(doc.uri, shared)
+            raise
+        finally:
+            shared.waiters -= 1
+
+    def _cancel_barrier(self, uri: str, shared: _SharedBarrier) -> None:
+        # Unregister right away so a caller arriving before the cancellation
+        # lands starts a fresh wait instead of joining the dying one.
+        if self._barriers.get(uri) is shared:
+            del self._barriers[uri]
+        shared.task.cancel()
+
+    def _barrier_done(self, uri: str, task: asyncio.Task) -> None:
+        shared = self._barriers.get(uri)
+        if shared is not None and shared.task is task:
+            del self._barriers[uri]
+        if not task.cancelled():
+            task.exception()  # mark retrieved: waiters may all have left
+
+    async def _wait_for_version(self, doc: DocState, requested_version: int) -> None:
+        path = doc.path
         doc.refcount += 1
         try:
             await self._transport.request(
                 "textDocument/waitForDiagnostics",
                 {"uri": doc.uri, "version": requested_version},
-                timeout=timeout or self.request_timeout,
+                timeout=self.request_timeout,
             )
             doc.barrier_version = max(
                 doc.barrier_version or requested_version, requested_version
@@ -490,21 +707,56 @@ class AsyncLeanLSPClient:
         col: int,
         extra: Optional[dict] = None,
         timeout: Optional[float] = None,
-    ):
-        lines = doc.lines()
-        line_str = lines[line] if 0 <= line < len(lines) else ""
-        params = {
-            "textDocument": {"uri": doc.uri},
-            "position": {
-                "line": line,
-                "character": codepoint_to_utf16(line_str, col),
-            },
-        }
-        if extra:
-            params.update(extra)
+    ) -> Any:
+        await self._flush_change(doc.path)
+        version = doc.version
+        cache_key = None
+        if (
+            self.response_cache_size > 0
+            and extra is None
+            and method in _CACHEABLE_METHODS
+            and doc.barrier_version == version
+        ):
+            cache_key = (doc.uri, version, method, line, col)
+            cached = self._response_cache.get(cache_key)
+            if cached is not None:
+                self._response_cache.move_to_end(cache_key)
+                doc.touch()
+                return orjson.loads(cached)  # fresh copy; callers may mutate
+        key = (
+            doc.uri,
+            version,
+            method,
+            line,
+            col,
+            orjson.dumps(extra) if extra else None,
+        )
+        shared = self._inflight.get(key)
+        if shared is not None and not shared.task.done():
+            shared.joined = True
+        else:
+            params = {
+                "textDocument": {"uri": doc.uri},
+                "position": position_to_utf16(doc.lines(), line, col),
+            }
+            if extra:
+                params.update(extra)
+            task = asyncio.ensure_future(
+                self._transport.request(method, params, timeout=timeout)
+            )
+            shared = _SharedRequest(task)
+            self._inflight[key] = shared
+            task.add_done_callback(lambda t, key=key: self._request_done(key, t))
+        shared.waiters += 1
         doc.refcount += 1
         try:
-            return await self._transport.request(method, params, timeout=timeout)
+            # Identical concurrent queries share one server request; the last
+            # caller to give up cancels it.
+            res = await asyncio.shield(shared.task)
+        except asyncio.CancelledError:
+            if shared.waiters == 1:
+                shared.task.cancel()
+            raise
         except LeanRpcError as e:
             if e.code in _WORKER_ERROR_CODES:
                 doc.mark_crashed(e.rpc_message)
@@ -513,8 +765,123 @@ class AsyncLeanLSPClient:
                 ) from e
             raise
         finally:
+            shared.waiters -= 1
             doc.refcount -= 1
             doc.touch()
+        # Only cache if no edit landed while the request was in flight.
+        if cache_key is not None and doc.version == version:
+            self._cache_response(cache_key, res)
+            if self.reuse_unedited_responses:
+                self._cached_lines[doc.uri] = (version, doc.lines())
+        if shared.joined:
+            # Each caller gets its own copy. The first one to resume
+            # serializes before anyone could have mutated the shared result.
+            if shared.data is None:
+                shared.data = orjson.dumps(res)
+            return orjson.loads(shared.data)
+        return res
+
+    def _request_done(self, key: tuple, task: asyncio.Future) -> None:
+        shared = self._inflight.get(key)
+        if shared is not None and shared.task is task:
+            del self._inflight[key]
+        if not task.cancelled():
+            task.exception()  # mark retrieved: waiters may all have left
+
+    def _cache_response(self, key: tuple, res: Any) -> None:
+        self._response_cache[key] = orjson.dumps(res)
+        if len(self._response_cache) > self.response_cache_size:
+            self._response_cache.popitem(last=False)
+
+    def _drop_cached_responses(self, uri: str) -> None:
+        self._cached_lines.pop(uri, None)
+        for key in [k for k in self._response_cache if k[0] == uri]:
+            del self._response_cache[key]
+
+    def _carry_over_responses(self, doc: DocState) -> None:
+        """Move cached answers above ``doc``'s edit to its new version."""
+        cached = self._cached_lines.pop(doc.uri, None)
+        if cached is None:
+            return
+        version, old_lines = cached
+        keep = _unedited_prefix(old_lines, doc.lines())
+        moved = False
+        for key in [k for k in self._response_cache if k[0] == doc.uri]:
+            data = self._response_cache.pop(key)
+            if key[1] == version and key[3] < keep:
+                self._response_cache[(doc.uri, doc.version, *key[2:])] = data
+                moved = True
+        if moved:
+            self._cached_lines[doc.uri] = (doc.version, doc.lines())
+
+    async def batch(
+        self,
+        calls: list[tuple[str, str, int, int]],
+        fresh: bool = True,
+        timeout: Optional[float] = None,
+    ) -> list:
+        """Send several position requests in one write; results in call order.
+
+        ``calls`` are ``(path, method, line, col)`` tuples, e.g. hover and
+        definition at the same cursor. Each distinct path is barrier-gated
+        once when ``fresh``. Results are the server responses, with ranges
+        of hover, location and highlight results converted to codepoint
+        columns as the per-method wrappers do.
+        """
+        docs = [self._doc(path) for path, _, _, _ in calls]
+        paths = {c[0] for c in calls}
+        if fresh:
+            await asyncio.gather(*(self.barrier(p, timeout=timeout) for p in paths))
+        for path in paths:
+            await self._flush_change(path)
+        requests = []
+        for doc, (_, method, line, col) in zip(docs, calls):
+            requests.append(
+                (
+                    method,
+                    {
+                        "textDocument": {"uri": doc.uri},
+                        "position": position_to_utf16(doc.lines(), line, col),
+                    },
+                )
+            )
+        for doc in docs:
+            doc.refcount += 1
+        try:
+            results = await self._transport.request_many(requests, timeout=timeout)
+        except LeanRpcError as e:
+            # Only attributable when the whole batch targets one file.
+            if e.code in _WORKER_ERROR_CODES and len({d.uri for d in docs}) == 1:
+                docs[0].mark_crashed(e.rpc_message)
+                raise LeanWorkerCrashed(
+                    f"File worker for {docs[0].path} died: {e.rpc_message}",
+                    uri=docs[0].uri,
+                ) from e
+            raise
+        finally:
+            for doc in docs:
+                doc.refcount -= 1
+                doc.touch()
+        return [
+            self._convert_result(doc, method, res)
+            for doc, (_, method, _, _), res in zip(docs, calls, results)
+        ]
+
+    def _convert_result(self, doc: DocState, method: str, res: Any) -> Any:
+        """Codepoint ranges for a raw position-request result (see batch)."""
+        if not res:
+            return res
+        if method in _LOCATION_METHODS:
+            if isinstance(res, dict):
+                return self._convert_location(res)
+            return [self._convert_location(loc) for loc in res]
+        if method == "textDocument/hover" and "range" in res:
+            res["range"] = range_from_utf16(doc.lines(), res["range"])
+        elif method == "textDocument/documentHighlight":
+            lines = doc.lines()
+            for highlight in res:
+                highlight["range"] = range_from_utf16(lines, highlight["range"])
+        return res
 
     async def diagnostics(
         self,
@@ -538,6 +905,9 @@ class AsyncLeanLSPClient:
                 if not partial_ok:
                     raise
                 partial = True
+        else:
+            # Pushed diagnostics only follow the text once the edit is sent.
+            await self._flush_change(path)
         lines = doc.lines()
         items = []
         for diag in doc.diagnostics:
@@ -560,6 +930,30 @@ class AsyncLeanLSPClient:
             processing_ranges=processing,
         )
 
+    async def _debounce(self, path: str, method: str) -> None:
+        """Wait ``debounce_ms``; raise if a newer query superseded this one."""
+        if self.debounce_ms <= 0:
+            return
+        key = (path, method)
+        previous = self._debounce_waiters.get(key)
+        if previous is not None and not previous.done():
+            previous.set_exception(
+                LeanRequestCancelled(f"{method} superseded by a newer request")
+            )
+        loop = asyncio.get_running_loop()
+        waiter = loop.create_future()
+        self._debounce_waiters[key] = waiter
+        handle = loop.call_later(
+            self.debounce_ms / 1000,
+            lambda: waiter.done() or waiter.set_result(None),
+        )
+        try:
+            await waiter
+        finally:
+            handle.cancel()
+            if self._debounce_waiters.get(key) is waiter:
+                del self._debounce_waiters[key]
+
     async def goal(
         self, path: str, line: int, col: int, fresh: bool = True
     ) -> GoalResult:
@@ -588,8 +982,12 @@ class AsyncLeanLSPClient:
         self, path: str, line: int, col: int, fresh: bool = True
     ) -> Optional[dict]:
         doc = self._doc(path)
+        await self._debounce(path, "textDocument/hover")
         if fresh:
             await self.barrier(path)
+        return await self._hover_at(doc, line, col)
+
+    async def _hover_at(self, doc: DocState, line: int, col: int) -> Optional[dict]:
         res = await self._request_at(doc, "textDocument/hover", line, col)
         if res and "range" in res:
             res["range"] = range_from_utf16(doc.lines(), res["range"])
@@ -599,6 +997,7 @@ class AsyncLeanLSPClient:
         self, path: str, line: int, col: int, fresh: bool = False
     ) -> list[dict]:
         doc = self._doc(path)
+        await self._debounce(path, "textDocument/completion")
         if fresh:
             await self.barrier(path)
         res = await self._request_at(
@@ -606,7 +1005,7 @@ class AsyncLeanLSPClient:
             "textDocument/completion",
             line,
             col,
-            extra={"context": {"triggerKind": 1}},
+            extra=_COMPLETION_CONTEXT,
         )
         if res is None:
             return []
@@ -664,10 +1063,118 @@ class AsyncLeanLSPClient:
             res = [res]
         return [self._convert_location(loc) for loc in res]
 
+    async def query_at(
+        self,
+        path: str,
+        line: int,
+        col: int,
+        kinds: tuple[str, ...] = (
+            "hover",
+            "definition",
+            "typeDefinition",
+            "goal",
+            "termGoal",
+        ),
+        fresh: bool = True,
+    ) -> dict[str, Any]:
+        """Run several cursor queries concurrently; results keyed by kind.
+
+        Kinds: ``hover``, ``definition``, ``declaration``, ``typeDefinition``,
+        ``goal`` and ``termGoal``. One barrier covers all of them, so the
+        cost is roughly the slowest single query rather than their sum.
+        """
+        queries = {
+            "hover": lambda: self.hover(path, line, col, fresh=False),
+            "goal": lambda: self.goal(path, line, col, fresh=False),
+            "termGoal": lambda: self.term_goal(path, line, col, fresh=False),
+        }
+        for kind in ("definition", "declaration", "typeDefinition"):
+            queries[kind] = lambda k=kind: self.goto(k, path, line, col, fresh=False)
+        unknown = [k for k in kinds if k not in queries]
+        if unknown:
+            raise ValueError(f"Unknown query kinds: {', '.join(unknown)}")
+        if fresh:
+            await self.barrier(path)
+        results = await asyncio.gather(*(queries[k]() for k in kinds))
+        return dict(zip(kinds, results))
+
+    async def _many(
+        self,
+        path: str,
+        positions: list[tuple[int, int]],
+        query: Callable[[int, int], Awaitable[Any]],
+        fresh: bool,
+        max_concurrency: int,
+    ) -> list:
+        if fresh:
+            await self.barrier(path)
+        sem = asyncio.Semaphore(max_concurrency)
+
+        async def one(line: int, col: int) -> Any:
+            async with sem:
+                return await query(line, col)
+
+        return list(await asyncio.gather(*(one(ln, c) for ln, c in positions)))
+
+    async def hover_many(
+        self,
+        path: str,
+        positions: list[tuple[int, int]],
+        fresh: bool = True,
+        max_concurrency: int = 32,
+    ) -> list[Optional[dict]]:
+        """Hover at many ``(line, col)`` positions; results in input order.
+
+        One barrier for the whole batch; at most ``max_concurrency`` requests
+        are in flight at once. Not debounced.
+        """
+        doc = self._doc(path)
+        return await self._many(
+            path,
+            positions,
+            lambda ln, c: self._hover_at(doc, ln, c),
+            fresh,
+            max_concurrency,
+        )
+
+    async def goal_many(
+        self,
+        path: str,
+        positions: list[tuple[int, int]],
+        fresh: bool = True,
+        max_concurrency: int = 32,
+    ) -> list[GoalResult]:
+        """Goals at many ``(line, col)`` positions; see :meth:`hover_many`."""
+        return await self._many(
+            path,
+            positions,
+            lambda ln, c: self.goal(path, ln, c, fresh=False),
+            fresh,
+            max_concurrency,
+        )
+
+    async def goto_many(
+        self,
+        kind: Literal["definition", "declaration", "typeDefinition"],
+        path: str,
+        positions: list[tuple[int, int]],
+        fresh: bool = True,
+        max_concurrency: int = 32,
+    ) -> list[list[dict]]:
+        """:meth:`goto` at many ``(line, col)`` positions; see :meth:`hover_many`."""
+        return await self._many(
+            path,
+            positions,
+            lambda ln, c: self.goto(kind, path, ln, c, fresh=False),
+            fresh,
+            max_concurrency,
+        )
+
     async def document_symbols(self, path: str, fresh: bool = True) -> list[dict]:
         doc = self._doc(path)
         if fresh:
             await self.barrier(path)
+        await self._flush_change(path)
         doc.refcount += 1
         try:
             res = await self._transport.request(
@@ -689,12 +1196,9 @@ class AsyncLeanLSPClient:
         doc = self._doc(path)
         if fresh:
             await self.barrier(path)
+        await self._flush_change(path)
         lines = doc.lines()
 
-        def pos(line: int, col: int) -> dict:
-            line_str = lines[line] if 0 <= line < len(lines) else ""
-            return {"line": line, "character": codepoint_to_utf16(line_str, col)}
-
         doc.refcount += 1
         try:
             res = await self._transport.request(
@@ -702,8 +1206,8 @@ class AsyncLeanLSPClient:
                 {
                     "textDocument": {"uri": doc.uri},
                     "range": {
-                        "start": pos(start_line, start_col),
-                        "end": pos(end_line, end_col),
+                        "start": position_to_utf16(lines, start_line, start_col),
+                        "end": position_to_utf16(lines, end_line, end_col),
                     },
                     "context": {"diagnostics": []},
                 },
@@ -761,19 +1265,15 @@ class AsyncLeanLSPClient:
         method: str,
         params: dict,
         timeout: float = 20.0,
-    ):
+    ) -> Any:
         doc = self._doc(path)
+        await self._flush_change(path)
         session = await self._rpc_session(doc, timeout)
-        lines = doc.lines()
-        line_str = lines[line] if 0 <= line < len(lines) else ""
         return await self._transport.request(
             "$/lean/rpc/call",
             {
                 "textDocument": {"uri": doc.uri},
-                "position": {
-                    "line": line,
-                    "character": codepoint_to_utf16(line_str, col),
-                },
+                "position": position_to_utf16(doc.lines(), line, col),
                 "sessionId": session,
                 "method": method,
                 "params": params,
@@ -809,9 +1309,7 @@ class AsyncLeanLSPClient:
         if fresh:
             await self.barrier(path)
         doc = self._doc(path)
-        lines = doc.lines()
-        line_str = lines[line] if 0 <= line < len(lines) else ""
-        pos = {"line": line, "character": codepoint_to_utf16(line_str, col)}
+        pos = position_to_utf16(doc.lines(), line, col)
         return await self.rpc_call(
             path,
             line,
@@ -825,24 +1323,19 @@ class AsyncLeanLSPClient:
     ) -> list[dict]:
         if fresh:
             await self.barrier(path)
-        doc = self._doc(path)
-        lines = doc.lines()
-        line_str = lines[line] if 0 <= line < len(lines) else ""
         res = await self.rpc_call(
             path,
             line,
             col,
             "Lean.Widget.getWidgets",
-            {"line": line, "character": codepoint_to_utf16(line_str, col)},
+            position_to_utf16(self._doc(path).lines(), line, col),
         )
         return (res or {}).get("widgets", [])
 
     async def get_widget_source(
         self, path: str, line: int, col: int, widget_hash: str
     ) -> Optional[dict]:
-        lines = self._doc(path).lines()
-        line_str = lines[line] if 0 <= line < len(lines) else ""
-        pos = {"line": line, "character": codepoint_to_utf16(line_str, col)}
+        pos = position_to_utf16(self._doc(path).lines(), line, col)
         return await self.rpc_call(
             path,
             line,
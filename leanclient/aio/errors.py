@@ -35,13 +35,14 @@ class LeanRequestTimeout(LeanClientError):
 
 
 class LeanRequestCancelled(LeanClientError):
-    """The server answered with RequestCancelled (-32800)."""
+    """The server answered with RequestCancelled (-32800), or a debounced
+    request was superseded by a newer one before it was sent."""
 
 
 class LeanRpcError(LeanClientError):
     """The server answered a request with a JSON-RPC error object."""
 
-    def __init__(self, code: int, message: str, data=None):
+    def __init__(self, code: int, message: str, data: object = None):
         super().__init__(f"LSP error {code}: {message}")
         self.code = code
         self.data = data
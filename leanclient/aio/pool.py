@@ -0,0 +1,52 @@
+"""LeanServerPool — warm language servers shared per project.
+
+Starting ``lake serve`` (and the first import elaboration behind it) is the
+expensive part of a short-lived client. Tools that run many small jobs
+against the same projects can get a started :class:`AsyncLeanLSPClient` from
+the pool instead; the client is safe for concurrent use, so every caller for
+a project shares one server.
+"""
+
+from __future__ import annotations
+
+import asyncio
+from pathlib import Path
+from typing import Any
+
+from .client import AsyncLeanLSPClient
+
+
+class LeanServerPool:
+    def __init__(self, **client_kwargs: Any):
+        """``client_kwargs`` are passed to every :class:`AsyncLeanLSPClient`."""
+        self._client_kwargs = client_kwargs
+        self._clients: dict[str, AsyncLeanLSPClient] = {}
+        self._locks: dict[str, asyncio.Lock] = {}
+
+    async def acquire(self, project_path: str) -> AsyncLeanLSPClient:
+        """Started client for ``project_path``; reused while it is alive."""
+        key = str(Path(project_path).resolve())
+        client = self._clients.get(key)
+        if client is not None and client.alive:
+            return client
+        lock = self._locks.setdefault(key, asyncio.Lock())
+        async with lock:
+            client = self._clients.get(key)
+            if client is not None and client.alive:
+                return client
+            if client is not None:
+                await client.close()  # server died: replace it
+            client = AsyncLeanLSPClient(key, **self._client_kwargs)
+            await client.start()
+            self._clients[key] = client
+            return client
+
+    async def prewarm(self, project_paths: list[str]) -> list[AsyncLeanLSPClient]:
+        """Start servers for several projects concurrently, ahead of use."""
+        return list(await asyncio.gather(*(self.acquire(p) for p in project_paths)))
+
+    async def close(self) -> None:
+        clients = list(self._clients.values())
+        self._clients.clear()
+        self._locks.clear()
+        await asyncio.gather(*(c.close() for c in clients))
@@ -41,7 +41,9 @@ class ScratchPool:
         self._header_lines = self.header.count("\n")
         self._size = size
         self._paths = [f"{name_prefix}_{i}.lean" for i in range(size)]
-        self._free: asyncio.Queue[str] = asyncio.Queue()
+        # LIFO: the most recently released slot is handed out first, so
+        # sequential trials keep hitting the same warm worker.
+        self._free: asyncio.LifoQueue[str] = asyncio.LifoQueue()
         self._warmed = False
         self._warm_lock = asyncio.Lock()
 
@@ -41,6 +41,7 @@ _ACK_REQUESTS = {
 }
 
 _STDERR_TAIL_BYTES = 64 * 1024
+_READ_CHUNK = 256 * 1024
 
 
 class LspTransport:
@@ -60,6 +61,8 @@ class LspTransport:
         self._ids = itertools.count(1)
         self._futures: dict[int, asyncio.Future] = {}
         self._write_lock = asyncio.Lock()
+        self._outbox: list[bytes] = []
+        self._flushes = 0  # bumped whenever the outbox is taken for a write
         self._stderr_tail: deque[bytes] = deque()
         self._stderr_len = 0
         self._reader_task: Optional[asyncio.Task] = None
@@ -138,6 +141,7 @@ class LspTransport:
             return
         self._death = exc
         self._closed.set()
+        self._outbox.clear()
         futures, self._futures = self._futures, {}
         for fut in futures.values():
             if not fut.done():
@@ -162,42 +166,42 @@ class LspTransport:
             pass
 
     async def _read_loop(self) -> None:
+        """Parse frames out of one growing ``bytearray``.
+
+        Stdout is read in large chunks instead of one ``readline`` per header
+        line plus a ``readexactly`` per body; bodies are decoded straight from
+        a view of the buffer, so a multi-megabyte response (semantic tokens,
+        symbols on Mathlib) is not copied again before ``orjson`` sees it.
+        """
         assert self._proc is not None and self._proc.stdout is not None
         rd = self._proc.stdout
+        buf = bytearray()
         try:
             while True:
-                content_length = None
-                # Parse headers until blank line; tolerate any header order.
-                while True:
-                    line = await rd.readline()
-                    if not line:
-                        raise LeanTransportError(
-                            "Language server closed the connection",
-                            self.stderr_tail(),
-                        )
-                    line = line.strip()
-                    if not line:
-                        break
-                    if line.lower().startswith(b"content-length:"):
-                        try:
-                            content_length = int(line.split(b":", 1)[1])
-                        except ValueError:
-                            raise LeanTransportError(
-                                f"Malformed Content-Length header: {line!r}",
-                                self.stderr_tail(),
-                            )
-                if content_length is None:
-                    raise LeanTransportError(
-                        "Message without Content-Length header", self.stderr_tail()
-                    )
-                body = await rd.readexactly(content_length)
+                header_end = buf.find(b"\r\n\r\n")
+                if header_end < 0:
+                    await self._fill(rd, buf, _READ_CHUNK)
+                    continue
+                start = header_end + 4
+                end = start + self._content_length(buf[:header_end])
+                while len(buf) < end:
+                    await self._fill(rd, buf, max(_READ_CHUNK, end - len(buf)))
+                view = memoryview(buf)
                 try:
-                    msg = orjson.loads(body)
+                    msg = orjson.loads(view[start:end])
                 except orjson.JSONDecodeError as e:
                     raise LeanTransportError(
                         f"Malformed JSON from server: {e}", self.stderr_tail()
                     )
-                self._dispatch(msg)
+                finally:
+                    view.release()
+                del buf[:end]
+                if isinstance(msg, list):
+                    # JSON-RPC batch response: dispatch each member.
+                    for item in msg:
+                        self._dispatch(item)
+                else:
+                    self._dispatch(msg)
         except asyncio.CancelledError:
             raise
         except LeanTransportError as e:
@@ -205,6 +209,30 @@ class LspTransport:
         except Exception as e:  # anything else: fail everything, never wedge
             self._die(LeanTransportError(f"Reader failed: {e!r}", self.stderr_tail()))
 
+    async def _fill(self, rd: asyncio.StreamReader, buf: bytearray, size: int) -> None:
+        chunk = await rd.read(size)
+        if not chunk:
+            raise LeanTransportError(
+                "Language server closed the connection", self.stderr_tail()
+            )
+        buf += chunk
+
+    def _content_length(self, header: bytearray) -> int:
+        """``Content-Length`` from a header block; tolerate any header order."""
+        for line in header.split(b"\r\n"):
+            line = line.strip()
+            if line.lower().startswith(b"content-length:"):
+                try:
+                    return int(line.split(b":", 1)[1])
+                except ValueError:
+                    raise LeanTransportError(
+                        f"Malformed Content-Length header: {bytes(line)!r}",
+                        self.stderr_tail(),
+                    )
+        raise LeanTransportError(
+            "Message without Content-Length header", self.stderr_tail()
+        )
+
     def _dispatch(self, msg: dict) -> None:
         method = msg.get("method")
         msg_id = msg.get("id")
@@ -234,7 +262,7 @@ class LspTransport:
             except Exception:
                 pass  # a broken notification handler must not kill the reader
 
-    async def _answer_server_request(self, msg_id, method: str) -> None:
+    async def _answer_server_request(self, msg_id: int | str, method: str) -> None:
         if method in _ACK_REQUESTS:
             payload = {"jsonrpc": "2.0", "id": msg_id, "result": None}
         else:
@@ -253,20 +281,51 @@ class LspTransport:
 
     # -- write side ----------------------------------------------------------
 
-    async def _write(self, payload: dict) -> None:
+    async def _write(self, *payloads: dict) -> None:
+        """Frame payloads and queue them for the next coalesced write.
+
+        Frames queued by concurrent writers (e.g. a hover, goal and highlight
+        fired together) go out in one ``write`` + ``drain``: the writer that
+        starts a batch yields once so writers from the same loop tick can
+        join, then flushes the whole outbox. Writers whose frames were flushed
+        by someone else return without touching the pipe. A writer cancelled
+        before its frames went out takes them back off the outbox.
+        """
         if not self.alive:
             raise self._death or LeanTransportError("Transport not started")
-        body = orjson.dumps(payload)
-        frame = b"Content-Length: %d\r\n\r\n" % len(body) + body
-        async with self._write_lock:
-            assert self._proc is not None and self._proc.stdin is not None
-            try:
-                self._proc.stdin.write(frame)
-                await self._proc.stdin.drain()
-            except (ConnectionResetError, BrokenPipeError) as e:
-                exc = LeanTransportError(f"Write failed: {e}", self.stderr_tail())
-                self._die(exc)
-                raise exc
+        frames = []
+        for payload in payloads:
+            body = orjson.dumps(payload)
+            frames.append(b"Content-Length: %d\r\n\r\n" % len(body) + body)
+        batch = self._flushes
+        starts_batch = not self._outbox
+        self._outbox.extend(frames)
+        try:
+            async with self._write_lock:
+                if starts_batch and self._flushes == batch:
+                    await asyncio.sleep(0)
+                if self._flushes != batch or not self._outbox:
+                    if self._death is not None:
+                        raise self._death  # the flush carrying our frames failed
+                    return
+                # No await between taking the outbox and handing it to the
+                # pipe: once taken, the frames are sent even if we're cancelled.
+                data = b"".join(self._outbox)
+                self._outbox.clear()
+                self._flushes += 1
+                assert self._proc is not None and self._proc.stdin is not None
+                try:
+                    self._proc.stdin.write(data)
+                    await self._proc.stdin.drain()
+                except (ConnectionResetError, BrokenPipeError) as e:
+                    exc = LeanTransportError(f"Write failed: {e}", self.stderr_tail())
+                    self._die(exc)
+                    raise exc
+        except asyncio.CancelledError:
+            if self._flushes == batch:
+                mine = {id(frame) for frame in frames}
+                self._outbox[:] = [f for f in self._outbox if id(f) not in mine]
+            raise
 
     async def notify(self, method: str, params: dict) -> None:
         await self._write({"jsonrpc": "2.0", "method": method, "params": params})
@@ -302,6 +361,55 @@ class LspTransport:
             await self._abandon(req_id)
             raise
 
+    async def request_many(
+        self, calls: list[tuple[str, dict]], timeout: Optional[float] = None
+    ) -> list[object]:
+        """Send several requests in one write; return results in call order.
+
+        LSP has no JSON-RPC batch arrays (``lake serve`` rejects them), so
+        every request keeps its own frame — but all futures are registered
+        first and all frames go out in a single write. The first failure is
+        raised like :meth:`request`; requests still pending are abandoned.
+        """
+        if timeout is None:
+            timeout = self._default_timeout
+        loop = asyncio.get_running_loop()
+        pending: list[tuple[int, asyncio.Future]] = []
+        payloads = []
+        for method, params in calls:
+            req_id = next(self._ids)
+            fut = loop.create_future()
+            self._futures[req_id] = fut
+            pending.append((req_id, fut))
+            payloads.append(
+                {"jsonrpc": "2.0", "id": req_id, "method": method, "params": params}
+            )
+        try:
+            await self._write(*payloads)
+        except BaseException:
+            for req_id, _ in pending:
+                self._futures.pop(req_id, None)
+            raise
+        try:
+            return await asyncio.wait_for(
+                asyncio.gather(*(fut for _, fut in pending)), timeout=timeout
+            )
+        except asyncio.TimeoutError:
+            await self._abandon_pending(pending)
+            raise LeanRequestTimeout(
+                f"Batch of {len(calls)} requests timed out after {timeout}s"
+            ) from None
+        except BaseException:
+            await self._abandon_pending(pending)
+            raise
+
+    async def _abandon_pending(self, pending: list[tuple[int, asyncio.Future]]) -> None:
+        for req_id, fut in pending:
+            if not fut.done() or fut.cancelled():
+                await self._abandon(req_id)
+            else:
+                fut.exception()  # mark retrieved: only the first error is raised
+
     async def _abandon(self, req_id: int) -> None:
         """Drop a pending request locally and tell the server to cancel it."""
         self._futures.pop(req_id, None)
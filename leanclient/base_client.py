@@ -1,5 +1,6 @@
 import asyncio
 import atexit
+import functools
 import logging
 import os
 import subprocess
@@ -9,7 +10,6 @@ from pathlib import Path
 from typing import Any, Callable
 
 import orjson
-import psutil
 
 from .utils import SemanticTokenProcessor, needs_mathlib_cache_get
 
@@ -25,12 +25,78 @@ IGNORED_METHODS = {
 ENABLE_LEANCLIENT_HISTORY = (
     os.getenv("ENABLE_LEANCLIENT_HISTORY", "false").lower() == "true"
 )
+LEANCLIENT_USE_UVLOOP = os.getenv("LEANCLIENT_USE_UVLOOP", "true").lower() == "true"
+# Pipe buffer size for the server's stdio. Large enough that a burst of
+# notifications (or one big response) is pulled in by a few read syscalls
+# instead of one per 8 KiB. Every write is flushed explicitly.
+PIPE_BUFFER_SIZE = 1024 * 1024
+# Initial (and retained) size of the reused message body buffer.
+READ_BUFFER_SIZE = 1024 * 1024
+
+
+def _new_event_loop(use_uvloop: bool = True) -> asyncio.AbstractEventLoop:
+    """Create the client's private event loop, using uvloop when installed.
+
+    Only this loop is affected; the global event loop policy is left alone.
+    uvloop does not support Windows, where the asyncio loop is always used.
+    """
+    if use_uvloop:
+        try:
+            import uvloop
+        except ImportError:
+            pass
+        else:
+            return uvloop.new_event_loop()
+    return asyncio.new_event_loop()
 
 
 class LSPProtocolError(RuntimeError):
     """Raised when the language server writes an invalid LSP frame."""
 
 
+class LSPResponseError(Exception):
+    """Raised when the language server answers a request with an error.
+
+    The JSON-RPC error object is available as :attr:`error`.
+    """
+
+    def __init__(self, error: Any):
+        super().__init__(f"LSP Error: {error}")
+        self.error = error
+
+
+# Path <-> URI conversion runs on every request and resolves against the
+# filesystem, so results are memoized per (project_path, path). The caches are
+# shared by every client in the process and never invalidated: the resolved
+# target of a symlink is fixed on first use.
+@functools.lru_cache(maxsize=4096)
+def _local_to_uri(project_path: Path, local_path: str) -> str:
+    path = (project_path / Path(local_path)).resolve()
+    return urllib.parse.unquote(path.as_uri())
+
+
+def _uri_to_abs(uri: str) -> Path:
+    parsed = urllib.parse.urlparse(uri)
+    if parsed.scheme and parsed.scheme != "file":
+        raise ValueError(f"Unsupported URI scheme: {parsed.scheme}")
+
+    path = urllib.parse.unquote(parsed.path)
+    # On windows we need to remove the leading slash
+    if os.name == "nt" and path.startswith("/"):
+        path = path[1:]
+    return Path(path)
+
+
+@functools.lru_cache(maxsize=4096)
+def _uri_to_local(project_path: Path, uri: str) -> str:
+    abs_path = _uri_to_abs(uri).resolve()
+    try:
+        rel_path = abs_path.relative_to(project_path)
+    except ValueError:
+        return abs_path.as_posix()
+    return rel_path.as_posix()
+
+
 class BaseLeanLSPClient:
     """BaseLeanLSPClient runs a language server in a subprocess.
 
@@ -42,6 +108,7 @@ class BaseLeanLSPClient:
         project_path: str,
         initial_build: bool = False,
         prevent_cache_get: bool = False,
+        use_uvloop: bool = LEANCLIENT_USE_UVLOOP,
     ):
         self.project_path = Path(project_path).resolve()
         self.request_id = 0  # Counter for generating unique request IDs
@@ -68,6 +135,7 @@ class BaseLeanLSPClient:
             stdout=subprocess.PIPE,
             stdin=subprocess.PIPE,
             stderr=subprocess.DEVNULL,
+            bufsize=PIPE_BUFFER_SIZE,
         )
         assert self.process.stdin is not None
         assert self.process.stdout is not None
@@ -75,12 +143,13 @@ class BaseLeanLSPClient:
         self.stdout = self.process.stdout
 
         # Asyncio infrastructure for non-blocking requests
-        self._loop = asyncio.new_event_loop()
+        self._loop = _new_event_loop(use_uvloop)
         self._futures = {}  # {request_id: asyncio.Future}
         self._futures_lock = threading.Lock()  # guards _futures and request_id
         self._write_lock = threading.Lock()  # serializes writes to stdin
         self._notification_handlers: dict[str, Callable[[dict], Any]] = {}
         self._reader_error: Exception | None = None
+        self._read_buffer = bytearray(READ_BUFFER_SIZE)  # reader thread only
 
         # Start event loop in a separate thread
         self._loop_thread = threading.Thread(
@@ -151,6 +220,8 @@ class BaseLeanLSPClient:
 
         # Terminate the language server process
         ## terminate children processes: `ps aux | grep lean`
+        import psutil  # only needed here; keeps `import leanclient` light
+
         try:
             children = psutil.Process(self.process.pid).children(recursive=True)
             for child in children:
@@ -189,7 +260,10 @@ class BaseLeanLSPClient:
     @staticmethod
     def _normalize_local_path(local_path: str | os.PathLike[str]) -> str:
         """Normalize Lean project-local paths to forward slashes."""
-        return urllib.parse.unquote(str(local_path)).replace("\\", "/")
+        local_path = str(local_path)
+        if "%" in local_path:  # unquote scans and copies; plain paths skip it
+            local_path = urllib.parse.unquote(local_path)
+        return local_path.replace("\\", "/")
 
     def _local_to_uri(self, local_path: str | os.PathLike[str]) -> str:
         """Convert a local file path to a URI.
@@ -200,16 +274,18 @@ class BaseLeanLSPClient:
         - local path:  MyProject/LeanFile.lean
         - URI:         file:///abs/to/project_path/MyProject/LeanFile.lean
 
+        Results are cached for the lifetime of the process, shared by all
+        clients on the same project: if a symlink or directory in the path is
+        changed meanwhile, the URI keeps pointing at the previously resolved
+        target.
+
         Args:
             local_path (str): Relative file path.
 
         Returns:
             str: URI representation of the file.
         """
-        path = (
-            self.project_path / Path(self._normalize_local_path(local_path))
-        ).resolve()
-        return urllib.parse.unquote(path.as_uri())
+        return _local_to_uri(self.project_path, self._normalize_local_path(local_path))
 
     def _locals_to_uris(self, local_paths: list[str]) -> list[str]:
         """See :meth:`_local_to_uri`"""
@@ -217,24 +293,11 @@ class BaseLeanLSPClient:
 
     def _uri_to_abs(self, uri: str) -> Path:
         """See :meth:`_local_to_uri`"""
-        parsed = urllib.parse.urlparse(uri)
-        if parsed.scheme and parsed.scheme != "file":
-            raise ValueError(f"Unsupported URI scheme: {parsed.scheme}")
-
-        path = urllib.parse.unquote(parsed.path)
-        # On windows we need to remove the leading slash
-        if os.name == "nt" and path.startswith("/"):
-            path = path[1:]
-        return Path(path)
+        return _uri_to_abs(uri)
 
     def _uri_to_local(self, uri: str) -> str:
-        """See :meth:`_local_to_uri`"""
-        abs_path = self._uri_to_abs(uri).resolve()
-        try:
-            rel_path = abs_path.relative_to(self.project_path)
-        except ValueError:
-            return abs_path.as_posix()
-        return rel_path.as_posix()
+        """See :meth:`_local_to_uri`; cached the same way."""
+        return _uri_to_local(self.project_path, uri)
 
     # LANGUAGE SERVER RPC INTERACTION
     def clear_history(self):
@@ -286,12 +349,20 @@ class BaseLeanLSPClient:
         """Read and validate one Content-Length framed LSP message."""
         headers: dict[str, str] = {}
         raw_headers: list[str] = []
+        content_length = None
 
         while True:
             header_line = self.stdout.readline()
             if not header_line:
                 raise EOFError("Language server process exited unexpectedly.")
 
+            # Fast path for the canonical header: parse the bytes directly.
+            if content_length is None and header_line.startswith(b"Content-Length: "):
+                value = header_line[16:].rstrip(b"\r\n")
+                if value.isdigit() and "content-length" not in headers:
+                    content_length = int(value)
+                    continue
+
             header = header_line.decode("utf-8", errors="replace").rstrip("\r\n")
             if not header:
                 break
@@ -301,36 +372,50 @@ class BaseLeanLSPClient:
             normalized_name = name.strip().lower()
             if not separator or not normalized_name:
                 raise LSPProtocolError(f"Malformed LSP header line: {header[:200]!r}")
-            if normalized_name in headers:
+            if normalized_name in headers or (
+                normalized_name == "content-length" and content_length is not None
+            ):
                 raise LSPProtocolError(
                     f"Duplicate LSP header {name.strip()!r}: {header[:200]!r}"
                 )
             headers[normalized_name] = value.strip()
 
-        raw_content_length = headers.get("content-length")
-        if raw_content_length is None:
-            rendered_headers = ", ".join(repr(header[:200]) for header in raw_headers)
-            raise LSPProtocolError(
-                f"Missing Content-Length LSP header; received [{rendered_headers}]"
-            )
-
-        if not raw_content_length.isascii() or not raw_content_length.isdigit():
-            raise LSPProtocolError(
-                f"Invalid Content-Length LSP header: {raw_content_length!r}"
-            )
-        content_length = int(raw_content_length)
+        if content_length is None:
+            raw_content_length = headers.get("content-length")
+            if raw_content_length is None:
+                rendered_headers = ", ".join(
+                    repr(header[:200]) for header in raw_headers
+                )
+                raise LSPProtocolError(
+                    f"Missing Content-Length LSP header; received [{rendered_headers}]"
+                )
 
-        body = self.stdout.read(content_length)
-        if len(body) != content_length:
-            raise LSPProtocolError(
-                "Language server closed before the complete LSP message body "
-                f"arrived: expected {content_length} bytes, got {len(body)}"
-            )
+            if not raw_content_length.isascii() or not raw_content_length.isdigit():
+                raise LSPProtocolError(
+                    f"Invalid Content-Length LSP header: {raw_content_length!r}"
+                )
+            content_length = int(raw_content_length)
+
+        # Read the body into a reused buffer instead of allocating a fresh
+        # bytes object per message; orjson parses the memoryview directly.
+        if len(self._read_buffer) < content_length:
+            self._read_buffer = bytearray(content_length)
+        with memoryview(self._read_buffer)[:content_length] as body:
+            received = self.stdout.readinto(body)
+            if received != content_length:
+                raise LSPProtocolError(
+                    "Language server closed before the complete LSP message body "
+                    f"arrived: expected {content_length} bytes, got {received}"
+                )
 
-        try:
-            message = orjson.loads(body)
-        except orjson.JSONDecodeError as exc:
-            raise LSPProtocolError("Language server wrote invalid LSP JSON.") from exc
+            try:
+                message = orjson.loads(body)
+            except orjson.JSONDecodeError as exc:
+                raise LSPProtocolError(
+                    "Language server wrote invalid LSP JSON."
+                ) from exc
+        if content_length > READ_BUFFER_SIZE:
+            self._read_buffer = bytearray(READ_BUFFER_SIZE)  # don't pin huge ones
         if not isinstance(message, dict):
             raise LSPProtocolError(
                 f"Language server wrote a non-object LSP message: {type(message).__name__}"
@@ -366,29 +451,20 @@ class BaseLeanLSPClient:
                 self._fail_pending_futures(error)
                 break
 
-            # Dispatch to futures and notification handlers
-            msg_id = msg.get("id")
-            method = msg.get("method")
-
             if self.enable_history:
                 self.history.append({"type": "server", "content": msg})
 
-            # Ignore certain methods from the server
-            if method in IGNORED_METHODS:
-                continue
-
-            # Handle response to a request
-            future = None
-            if msg_id is not None:
+            # Responses are the bulk of the traffic: resolve them first
+            msg_id = msg.get("id")
+            if msg_id is not None and "method" not in msg:
                 with self._futures_lock:
                     future = self._futures.pop(msg_id, None)
-            if future is not None:
                 # Check if event loop is still running before dispatching
-                if self._loop and not self._loop.is_closed():
+                if future is not None and self._loop and not self._loop.is_closed():
                     if "error" in msg:
                         self._loop.call_soon_threadsafe(
                             future.set_exception,
-                            Exception(f"LSP Error: {msg['error']}"),
+                            LSPResponseError(msg["error"]),
                         )
                     else:
                         self._loop.call_soon_threadsafe(
@@ -396,6 +472,11 @@ class BaseLeanLSPClient:
                         )
                 continue
 
+            # Ignore certain methods from the server
+            method = msg.get("method")
+            if method in IGNORED_METHODS:
+                continue
+
             # Handle notification with registered handler
             if method is not None:
                 handler = self._notification_handlers.get(method)
@@ -414,14 +495,29 @@ class BaseLeanLSPClient:
         Args:
             message (dict): Full JSON-RPC message (including ``id`` for requests).
         """
-        body = orjson.dumps(message)
-        header = f"Content-Length: {len(body)}\r\n\r\n".encode("ascii")
+        self._write_messages([message])
+
+    def _write_messages(self, messages: list[dict]) -> None:
+        """Serialize several JSON-RPC messages and write them in one go.
+
+        All frames are written under a single lock acquisition and flushed
+        once, so the server receives the whole burst together.
+
+        Args:
+            messages (list[dict]): Full JSON-RPC messages, in send order.
+        """
+        frames = []
+        for message in messages:
+            body = orjson.dumps(message)
+            frames.append(b"Content-Length: %d\r\n\r\n" % len(body))
+            frames.append(body)
         with self._write_lock:
-            self.stdin.write(header + body)
+            self.stdin.write(b"".join(frames))
             self.stdin.flush()
 
         if self.enable_history:
-            self.history.append({"type": "client", "content": message})
+            for message in messages:
+                self.history.append({"type": "client", "content": message})
 
     def _send_notification(self, method: str, params: dict):
         """Send a notification to the language server.
@@ -432,6 +528,17 @@ class BaseLeanLSPClient:
         """
         self._write_message({"jsonrpc": "2.0", "method": method, "params": params})
 
+    def _send_notifications(self, method: str, params_list: list[dict]):
+        """Send the same notification for several parameter sets in one write.
+
+        Args:
+            method (str): Method name.
+            params_list (list[dict]): Parameters for each notification.
+        """
+        self._write_messages(
+            [{"jsonrpc": "2.0", "method": method, "params": p} for p in params_list]
+        )
+
     def _send_request_async(self, method: str, params: dict) -> asyncio.Future:
         """Send a request and return an asyncio.Future immediately (non-blocking).
 
@@ -446,26 +553,51 @@ class BaseLeanLSPClient:
         Returns:
             asyncio.Future: Future that will be resolved when the response arrives.
         """
-        future = self._loop.create_future()
+        return self._send_requests_async([(method, params)])[0]
+
+    def _send_requests_async(
+        self, calls: list[tuple[str, dict]]
+    ) -> list[asyncio.Future]:
+        """Send several requests in one write and return their futures.
+
+        LSP has no JSON-RPC batch arrays, so every request keeps its own frame,
+        but all futures are registered first and all frames are written at once.
+
+        Args:
+            calls (list[tuple[str, dict]]): ``(method, params)`` pairs.
+
+        Returns:
+            list[asyncio.Future]: One future per call, in call order.
+        """
+        futures = [self._loop.create_future() for _ in calls]
+        messages = []
         reader_error = None
         with self._futures_lock:
             if self._reader_error is not None:
                 reader_error = self._reader_error
             else:
-                request_id = self.request_id
-                self.request_id += 1
-                self._futures[request_id] = future
+                for future, (method, params) in zip(futures, calls):
+                    request_id = self.request_id
+                    self.request_id += 1
+                    self._futures[request_id] = future
+                    messages.append(
+                        {
+                            "jsonrpc": "2.0",
+                            "id": request_id,
+                            "method": method,
+                            "params": params,
+                        }
+                    )
 
         if reader_error is not None:
-            self._loop.call_soon_threadsafe(
-                self._set_future_exception_if_pending, future, reader_error
-            )
-            return future
+            for future in futures:
+                self._loop.call_soon_threadsafe(
+                    self._set_future_exception_if_pending, future, reader_error
+                )
+            return futures
 
-        self._write_message(
-            {"jsonrpc": "2.0", "id": request_id, "method": method, "params": params}
-        )
-        return future
+        self._write_messages(messages)
+        return futures
 
     def _send_request_sync(
         self, method: str, params: dict, timeout: float | None = 120.0
@@ -491,6 +623,27 @@ class BaseLeanLSPClient:
             timeout=timeout
         )
 
+    def _send_requests_sync(
+        self, calls: list[tuple[str, dict]], timeout: float | None = 120.0
+    ) -> list:
+        """Send several requests in one write and block until all responses arrive.
+
+        Args:
+            calls (list[tuple[str, dict]]): ``(method, params)`` pairs.
+            timeout (float | None): Timeout in seconds for the whole batch. Defaults to 120.
+
+        Returns:
+            list: Responses in call order.
+        """
+        futures = self._send_requests_async(calls)
+
+        async def await_futures():
+            return await asyncio.gather(*futures)
+
+        return asyncio.run_coroutine_threadsafe(await_futures(), self._loop).result(
+            timeout=timeout
+        )
+
     def _register_notification_handler(self, method: str, handler):
         """Register a handler for a specific notification method.
 
@@ -612,6 +765,6 @@ class BaseLeanLSPClient:
         for line in response.stdout.split("\n"):
             if not line:
                 continue
-            key, value = line.split("=", 1)
+            key, _, value = line.partition("=")
             env[key] = value
         return env
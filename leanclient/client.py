@@ -1,10 +1,15 @@
 from collections import defaultdict
+from collections.abc import Iterable
+from concurrent.futures import Future
+from dataclasses import dataclass, field
 from typing import Any
 
+import orjson
+
 from leanclient.info_tree import parse_info_tree
 from leanclient.single_file_client import SingleFileClient
 
-from .base_client import BaseLeanLSPClient
+from .base_client import LEANCLIENT_USE_UVLOOP, BaseLeanLSPClient, LSPResponseError
 from .file_manager import LSPFileManager
 from .utils import (
     SYMBOL_KIND_MAP,
@@ -14,6 +19,49 @@ from .utils import (
     get_diagnostics_in_range,
 )
 
+# Constant request fragments, shared across calls. They are only serialized,
+# never mutated, so building them once per request is unnecessary.
+_COMPLETION_CONTEXT = {"context": {"triggerKind": 1}}  # 1 = Invoked
+
+# Position requests whose answer is fixed once a file version is fully
+# processed. Responses are kept per file, see FileState.position_responses.
+_CACHEABLE_METHODS = frozenset(
+    {
+        "textDocument/hover",
+        "textDocument/declaration",
+        "textDocument/definition",
+        "textDocument/typeDefinition",
+        "textDocument/documentHighlight",
+        "$/lean/plainGoal",
+        "$/lean/plainTermGoal",
+    }
+)
+POSITION_CACHE_SIZE = 256
+
+
+@dataclass(slots=True)
+class _SharedRequest:
+    """A position request other threads can wait on instead of resending it."""
+
+    future: Future = field(default_factory=Future)
+    joined: bool = False
+
+
+def _code_action_uri(code_action: dict) -> str | None:
+    """Return the URI of the document a code action refers to, if any."""
+    edit = code_action.get("edit") or {}
+    changes = edit.get("changes")
+    if changes:
+        return next(iter(changes))
+    for change in edit.get("documentChanges") or []:
+        uri = (change.get("textDocument") or {}).get("uri")
+        if uri:
+            return uri
+    data = code_action.get("data")
+    if isinstance(data, dict):
+        return ((data.get("params") or {}).get("textDocument") or {}).get("uri")
+    return None
+
 
 class LeanLSPClient(LSPFileManager, BaseLeanLSPClient):
     """LeanLSPClient is a thin wrapper around the Lean language server.
@@ -42,6 +90,7 @@ class LeanLSPClient(LSPFileManager, BaseLeanLSPClient):
         max_opened_files (int): Maximum number of files to keep open at once. Defaults to 4.
         initial_build (bool): Whether to run `lake build` on initialization. Defaults to False. The Lean LSP server does not require a build to function - it will build dependencies on-demand when files are opened.
         prevent_cache_get (bool): Prevent automatic `lake exe cache get` for mathlib projects. Defaults to False. Useful for tests to avoid repeated cache downloads.
+        use_uvloop (bool): Run the client's internal event loop on uvloop if it is installed (`pip install leanclient[fast]`, not available on Windows). Defaults to True unless the LEANCLIENT_USE_UVLOOP environment variable is set to "false".
     """
 
     def __init__(
@@ -50,20 +99,108 @@ class LeanLSPClient(LSPFileManager, BaseLeanLSPClient):
         max_opened_files: int = 4,
         initial_build: bool = False,
         prevent_cache_get: bool = False,
+        use_uvloop: bool = LEANCLIENT_USE_UVLOOP,
     ):
-        BaseLeanLSPClient.__init__(self, project_path, initial_build, prevent_cache_get)
+        BaseLeanLSPClient.__init__(
+            self, project_path, initial_build, prevent_cache_get, use_uvloop
+        )
         LSPFileManager.__init__(self, max_opened_files)
+        self._shared_requests: dict[tuple, _SharedRequest] = {}
 
-    def create_file_client(self, file_path: str) -> SingleFileClient:
+    def create_file_client(
+        self, file_path: str, eager_open: bool = False
+    ) -> SingleFileClient:
         """Create a SingleFileClient for a file.
 
         Args:
             file_path (str): Relative file path.
+            eager_open (bool): Open the file immediately instead of on the first query. Defaults to False.
 
         Returns:
             SingleFileClient: A client for interacting with a single file.
         """
-        return SingleFileClient(self, file_path)
+        return SingleFileClient(self, file_path, eager_open)
+
+    def _send_request_at(
+        self,
+        path: str,
+        method: str,
+        line: int,
+        character: int,
+        extra: dict | None = None,
+    ) -> Any:
+        """Send a request for a file position.
+
+        Responses to :data:`_CACHEABLE_METHODS` are cached for a fully processed
+        file version (up to :data:`POSITION_CACHE_SIZE` per file) and dropped on
+        the next change. Concurrent identical requests from several threads
+        are sent once. Every call returns a fresh copy.
+
+        Args:
+            path (str): Relative file path.
+            method (str): Method name.
+            line (int): Line number.
+            character (int): Character number.
+            extra (dict | None): Additional request parameters.
+
+        Returns:
+            Any: Response or error dict, see :meth:`_send_request`.
+        """
+        params: dict[str, Any] = {"position": {"line": line, "character": character}}
+        if extra:
+            params |= extra
+            return self._send_request(path, method, params)
+        if method not in _CACHEABLE_METHODS:
+            return self._send_request(path, method, params)
+
+        path = self._normalize_local_path(path)
+        key = (method, line, character)
+        with self._opened_files_lock:
+            state = self.opened_files.get(path)
+            cached_version = state.version if state and state.complete else None
+            if cached_version is not None:
+                cached = state.position_responses.pop(key, None)
+                if cached is not None:
+                    state.position_responses[key] = cached  # most recent last
+                    return orjson.loads(cached)
+            # Identical concurrent requests (e.g. an editor and an agent
+            # hovering the same spot) share one server round-trip.
+            shared_key = (path, state.version if state else None, *key)
+            shared = self._shared_requests.get(shared_key)
+            owner = shared is None
+            if owner:
+                shared = self._shared_requests[shared_key] = _SharedRequest()
+            else:
+                shared.joined = True
+
+        if not owner:
+            return orjson.loads(shared.future.result())
+
+        try:
+            res = self._send_request(path, method, params)
+        except BaseException as e:
+            with self._opened_files_lock:
+                del self._shared_requests[shared_key]
+            shared.future.set_exception(e)
+            raise
+
+        failed = isinstance(res, dict) and "error" in res
+        with self._opened_files_lock:
+            del self._shared_requests[shared_key]
+            cacheable = not failed and cached_version is not None
+            data = orjson.dumps(res) if shared.joined or cacheable else None
+            if (
+                cacheable
+                and self.opened_files.get(path) is state
+                and state.version == cached_version
+                and state.complete
+            ):
+                responses = state.position_responses
+                responses[key] = data
+                if len(responses) > POSITION_CACHE_SIZE:
+                    del responses[next(iter(responses))]
+        shared.future.set_result(data)
+        return res
 
     def get_completions(self, path: str, line: int, character: int) -> list:
         """Get completion items at a file position.
@@ -99,13 +236,12 @@ class LeanLSPClient(LSPFileManager, BaseLeanLSPClient):
         Returns:
             list: Completion items.
         """
-        resp = self._send_request(
+        resp = self._send_request_at(
             path,
             "textDocument/completion",
-            {
-                "position": {"line": line, "character": character},
-                "context": {"triggerKind": 1},
-            },
+            line,
+            character,
+            _COMPLETION_CONTEXT,
         )
         items = resp["items"]  # NOTE: We discard `isIncomplete` for now
         # We add the original file URI so we can resolve later
@@ -178,11 +314,7 @@ class LeanLSPClient(LSPFileManager, BaseLeanLSPClient):
         Returns:
             dict: Hover information or None if no hover information is available.
         """
-        return self._send_request(
-            path,
-            "textDocument/hover",
-            {"position": {"line": line, "character": character}},
-        )
+        return self._send_request_at(path, "textDocument/hover", line, character)
 
     def get_declarations(self, path: str, line: int, character: int) -> list:
         """Get locations of declarations at a file position.
@@ -222,11 +354,7 @@ class LeanLSPClient(LSPFileManager, BaseLeanLSPClient):
         Returns:
             list: Locations.
         """
-        return self._send_request(
-            path,
-            "textDocument/declaration",
-            {"position": {"line": line, "character": character}},
-        )
+        return self._send_request_at(path, "textDocument/declaration", line, character)
 
     def get_definitions(self, path: str, line: int, character: int) -> list:
         """Get location of symbol definition at a file position.
@@ -267,11 +395,7 @@ class LeanLSPClient(LSPFileManager, BaseLeanLSPClient):
         Returns:
             list: Locations.
         """
-        return self._send_request(
-            path,
-            "textDocument/definition",
-            {"position": {"line": line, "character": character}},
-        )
+        return self._send_request_at(path, "textDocument/definition", line, character)
 
     def get_references(
         self,
@@ -312,7 +436,7 @@ class LeanLSPClient(LSPFileManager, BaseLeanLSPClient):
             character (int): Character number.
             include_declaration (bool): Whether to include the declaration itself in the results. Defaults to False.
             max_retries (int): Number of times to retry if no new results were found. Defaults to 3.
-            retry_delay (float): Time to wait between retries. Defaults to 0.001.
+            retry_delay (float): Base time to wait between retries, doubled after each unchanged result. Defaults to 0.001.
 
         Returns:
             list: Locations.
@@ -366,10 +490,8 @@ class LeanLSPClient(LSPFileManager, BaseLeanLSPClient):
         Returns:
             list: Locations.
         """
-        return self._send_request(
-            path,
-            "textDocument/typeDefinition",
-            {"position": {"line": line, "character": character}},
+        return self._send_request_at(
+            path, "textDocument/typeDefinition", line, character
         )
 
     def get_document_highlights(self, path: str, line: int, character: int) -> list:
@@ -403,10 +525,8 @@ class LeanLSPClient(LSPFileManager, BaseLeanLSPClient):
             list: Document highlights.
         """
 
-        return self._send_request(
-            path,
-            "textDocument/documentHighlight",
-            {"position": {"line": line, "character": character}},
+        return self._send_request_at(
+            path, "textDocument/documentHighlight", line, character
         )
 
     def get_document_symbols(self, path: str) -> list:
@@ -454,7 +574,7 @@ class LeanLSPClient(LSPFileManager, BaseLeanLSPClient):
                 symbol["kind"] = SYMBOL_KIND_MAP.get(symbol["kind"], "unknown")
         return response
 
-    def get_semantic_tokens(self, path: str) -> list:
+    def get_semantic_tokens(self, path: str, as_array: bool = False) -> Any:
         """Get semantic tokens for the entire document.
 
         The :guilabel:`textDocument/semanticTokens/full` method in LSP returns semantic tokens for the entire document.
@@ -463,6 +583,8 @@ class LeanLSPClient(LSPFileManager, BaseLeanLSPClient):
 
         See :meth:`get_semantic_tokens_range` for limiting to parts of a document.
 
+        Tokens of a fully processed file are cached until the file changes or is closed.
+
         More information:
 
         - LSP Docs: `Semantic Tokens Full Request <https://microsoft.github.io/language-server-protocol/specifications/lsp/3.17/specification/#semanticTokens_fullRequest>`_
@@ -481,12 +603,40 @@ class LeanLSPClient(LSPFileManager, BaseLeanLSPClient):
 
         Args:
             path (str): Relative file path.
+            as_array (bool): Return an ``(N, 4)`` NumPy int32 array instead, see :meth:`SemanticTokenProcessor.decode_array`. Requires NumPy. Defaults to False.
 
         Returns:
-            list: Semantic tokens.
+            list | numpy.ndarray: Semantic tokens.
         """
-        res = self._send_request(path, "textDocument/semanticTokens/full", {})
-        return self.token_processor(res["data"])
+        path = self._normalize_local_path(path)
+        with self._opened_files_lock:
+            state = self.opened_files.get(path)
+            data = state.semantic_tokens_data if state is not None else None
+            if data is not None and not as_array and state.semantic_tokens is not None:
+                return [list(token) for token in state.semantic_tokens]
+            # Tokens only stop changing once the file is fully processed.
+            cached_version = state.version if state and state.complete else None
+
+        if data is None:
+            res = self._send_request(path, "textDocument/semanticTokens/full", {})
+            data = res["data"]
+        if as_array:
+            tokens = self.token_processor.decode_array(data)
+        else:
+            tokens = self.token_processor(data)
+
+        if state is not None and cached_version is not None:
+            with self._opened_files_lock:
+                if (
+                    self.opened_files.get(path) is state
+                    and state.version == cached_version
+                    and state.complete
+                ):
+                    state.semantic_tokens_data = data
+                    if not as_array:
+                        state.semantic_tokens = tokens
+                        tokens = [list(token) for token in tokens]
+        return tokens
 
     def get_semantic_tokens_range(
         self,
@@ -495,7 +645,8 @@ class LeanLSPClient(LSPFileManager, BaseLeanLSPClient):
         start_character: int,
         end_line: int,
         end_character: int,
-    ) -> list:
+        as_array: bool = False,
+    ) -> Any:
         """Get semantic tokens for a range in a document.
 
         See :meth:`get_semantic_tokens_full` for more information.
@@ -506,9 +657,10 @@ class LeanLSPClient(LSPFileManager, BaseLeanLSPClient):
             start_character (int): Start character.
             end_line (int): End line.
             end_character (int): End character.
+            as_array (bool): Return an ``(N, 4)`` NumPy int32 array instead. Defaults to False.
 
         Returns:
-            list: Semantic tokens.
+            list | numpy.ndarray: Semantic tokens.
         """
         res = self._send_request(
             path,
@@ -520,6 +672,8 @@ class LeanLSPClient(LSPFileManager, BaseLeanLSPClient):
                 }
             },
         )
+        if as_array:
+            return self.token_processor.decode_array(res["data"])
         return self.token_processor(res["data"])
 
     def get_folding_ranges(self, path: str) -> list:
@@ -555,6 +709,35 @@ class LeanLSPClient(LSPFileManager, BaseLeanLSPClient):
         params = {"textDocument": {"uri": uri, "version": version}}
         return self._send_request_sync("textDocument/foldingRange", params)
 
+    def get_document_requests(
+        self, path: str, methods: list[str], timeout: float = 120.0
+    ) -> list:
+        """Send several document-wide requests for a file in a single write.
+
+        Useful when symbols, folding ranges and semantic tokens are all needed:
+        the requests are sent together and answered in one round-trip instead of three.
+        Each method is called with only the ``textDocument`` parameter.
+
+        Example:
+
+        .. code-block:: python
+
+            symbols, folding = client.get_document_requests(
+                path, ["textDocument/documentSymbol", "textDocument/foldingRange"]
+            )
+
+        Args:
+            path (str): Relative file path.
+            methods (list[str]): LSP method names, e.g. ``textDocument/semanticTokens/full``.
+            timeout (float): Timeout in seconds for all requests. Defaults to 120.
+
+        Returns:
+            list: Raw responses in the order of ``methods``.
+        """
+        uri, version = self._ensure_file_processed(path)
+        params = {"textDocument": {"uri": uri, "version": version}}
+        return self._send_requests_sync([(m, params) for m in methods], timeout)
+
     @experimental
     def get_call_hierarchy_items(self, path: str, line: int, character: int) -> list:
         """Get call hierarchy items at a file position.
@@ -592,13 +775,11 @@ class LeanLSPClient(LSPFileManager, BaseLeanLSPClient):
         Returns:
             list: Call hierarchy items.
         """
-        # Ensure diagnostics are up-to-date so the server has processed the file.
-        self.get_diagnostics(path)
+        # The server answers from the processed file; a no-op once it is.
+        self._ensure_file_processed(path)
 
-        return self._send_request(
-            path,
-            "textDocument/prepareCallHierarchy",
-            {"position": {"line": line, "character": character}},
+        return self._send_request_at(
+            path, "textDocument/prepareCallHierarchy", line, character
         )
 
     @experimental
@@ -729,11 +910,7 @@ class LeanLSPClient(LSPFileManager, BaseLeanLSPClient):
         Returns:
             dict | None: Proof goals at the position.
         """
-        return self._send_request(
-            path,
-            "$/lean/plainGoal",
-            {"position": {"line": line, "character": character}},
-        )
+        return self._send_request_at(path, "$/lean/plainGoal", line, character)
 
     def get_term_goal(self, path: str, line: int, character: int) -> dict | None:
         """Get term goal at a file position.
@@ -772,11 +949,7 @@ class LeanLSPClient(LSPFileManager, BaseLeanLSPClient):
         Returns:
             dict | None: Term goal at the position.
         """
-        return self._send_request(
-            path,
-            "$/lean/plainTermGoal",
-            {"position": {"line": line, "character": character}},
-        )
+        return self._send_request_at(path, "$/lean/plainTermGoal", line, character)
 
     def get_code_actions(
         self,
@@ -787,6 +960,8 @@ class LeanLSPClient(LSPFileManager, BaseLeanLSPClient):
         end_character: int,
         max_retries: int = 3,
         retry_delay: float = 0.001,
+        diagnostics: Iterable[dict] | None = None,
+        require_diagnostics: bool = False,
     ) -> list:
         """Get code actions for a text range.
 
@@ -863,11 +1038,22 @@ class LeanLSPClient(LSPFileManager, BaseLeanLSPClient):
             end_line (int): End line.
             end_character (int): End character.
             max_retries (int): Number of times to retry if no new results were found. Defaults to 3.
-            retry_delay (float): Time to wait between retries. Defaults to 0.001.
+            retry_delay (float): Base time to wait between retries, doubled after each unchanged result. Defaults to 0.001.
+            diagnostics (Iterable[dict] | None): Diagnostics of the file, e.g. from an earlier :meth:`get_diagnostics` call. Skips waiting for and collecting them again. Defaults to None, which waits like :meth:`get_diagnostics` (15 seconds of inactivity) and uses the same diagnostics, including its RPC and fatal error placeholders.
+            require_diagnostics (bool): Return an empty list without querying the server if no diagnostic overlaps the range. Most Lean code actions are diagnostic fixes, but some providers (e.g. tactic suggestions) also act on clean code. Defaults to False.
 
         Returns:
             list: Code actions.
         """
+        if diagnostics is None:
+            # Read the pushed diagnostics directly; no DiagnosticsResult needed.
+            path = self._normalize_local_path(path)
+            self._ensure_file_processed(path, inactivity_timeout=15.0)
+            with self._opened_files_lock:
+                diagnostics = self.opened_files[path].reported_diagnostics()
+        in_range = get_diagnostics_in_range(diagnostics, start_line, end_line)
+        if require_diagnostics and not in_range:
+            return []
         return self._send_request_retry(
             path,
             "textDocument/codeAction",
@@ -877,9 +1063,7 @@ class LeanLSPClient(LSPFileManager, BaseLeanLSPClient):
                     "end": {"line": end_line, "character": end_character},
                 },
                 "context": {
-                    "diagnostics": get_diagnostics_in_range(
-                        self.get_diagnostics(path), start_line, end_line
-                    ),
+                    "diagnostics": in_range,
                     "triggerKind": 1,  # Doesn't come up in lean4 repo. 1 = Invoked: Completion was triggered by typing an identifier (24x7 code complete), manual invocation (e.g Ctrl+Space) or via API.
                 },
             },
@@ -936,29 +1120,21 @@ class LeanLSPClient(LSPFileManager, BaseLeanLSPClient):
         Returns:
             dict: Resolved code action.
         """
-        try:
-            uri = list(code_action["edit"]["changes"].keys())[0]
+        # The server resolves against the file's snapshot, so it must be open.
+        uri = _code_action_uri(code_action)
+        if uri is not None:
+            path = self._uri_to_local(uri)
             with self._opened_files_lock:
-                if uri not in self.opened_files:
-                    self.open_file(uri)
-        except Exception:
-            pass
+                is_open = path in self.opened_files
+            if not is_open:
+                self.open_file(path)
 
         try:
             result = self._send_request_sync("codeAction/resolve", code_action)
             return result
-        except Exception as e:
+        except LSPResponseError as e:
             # Return error in the old format for backward compatibility
-            if "LSP Error:" in str(e):
-                error_msg = str(e).replace("LSP Error: ", "")
-                import ast
-
-                try:
-                    error_dict = ast.literal_eval(error_msg)
-                    return {"error": error_dict}
-                except Exception:
-                    return {"error": {"message": str(e)}}
-            raise
+            return {"error": e.error}
 
     def apply_code_action_resolve(self, code_action_resolved: dict) -> None:
         """Apply all edits of a resolved code action.
@@ -1182,10 +1358,7 @@ class LeanLSPClient(LSPFileManager, BaseLeanLSPClient):
         path = self._normalize_local_path(path)
 
         # Ensure file is opened and processed so imports are available
-        self.get_diagnostics(path)
-
-        with self._opened_files_lock:
-            uri = self.opened_files[path].uri
+        uri, _ = self._ensure_file_processed(path)
 
         params = {"textDocument": {"uri": uri}}
         return self._send_request_sync("$/lean/prepareModuleHierarchy", params)
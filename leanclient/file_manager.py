@@ -1,11 +1,17 @@
 import logging
+import random
 import threading
 import time
 from dataclasses import dataclass, field
 from typing import Any, Iterator
 
-from .base_client import BaseLeanLSPClient
-from .utils import DocumentContentChange, apply_changes_to_text, normalize_newlines
+from .base_client import BaseLeanLSPClient, LSPResponseError
+from .utils import (
+    DocumentContentChange,
+    apply_changes_to_text,
+    normalize_newlines,
+    read_source_file,
+)
 
 logger = logging.getLogger(__name__)
 
@@ -58,13 +64,21 @@ class DiagnosticsResult:
 DIAGNOSTICS_GRACE_PERIOD = 0.5
 
 # Max time to block on the close condition between re-checks while waiting for
-# diagnostics. Notifications wake the waiter early; this only bounds how quickly
-# time-based readiness (grace period / inactivity) is re-evaluated.
-WAIT_POLL_INTERVAL = 0.05
+# diagnostics. Notifications and finished waitForDiagnostics requests wake the
+# waiter, and time-based readiness (grace period / inactivity) is re-checked at
+# its exact deadline; this cap is only a safety net.
+WAIT_POLL_INTERVAL = 1.0
 
 # Unique sentinel for "no previous result yet" in retry loops.
 _NO_PREVIOUS_RESULT = object()
 
+# Upper bound for the exponentially growing delay between stable-result retries.
+RETRY_MAX_DELAY = 1.0
+
+
+# Placeholder reported when the server hit a fatal error without diagnostics
+FATAL_ERROR_MESSAGE = "leanclient: Received LeanFileProgressKind.fatalError."
+
 
 @dataclass(slots=True)
 class FileState:
@@ -85,6 +99,11 @@ class FileState:
     dependency_rebuild_attempted: bool = False
     last_activity: float = field(default_factory=time.monotonic)
     wait_for_diag_done: bool = False  # True when waitForDiagnostics RPC completed
+    # Cached for a fully processed version: raw response data and decoded rows
+    semantic_tokens_data: list[int] | None = None
+    semantic_tokens: list | None = None
+    # Serialized position-request responses for a fully processed version
+    position_responses: dict[tuple, bytes] = field(default_factory=dict)
 
     def reset_after_change(self):
         """Reset diagnostics-related state after a content change."""
@@ -98,6 +117,21 @@ class FileState:
         self.close_ready = False
         self.last_activity = time.monotonic()
         self.wait_for_diag_done = False
+        self.semantic_tokens_data = None
+        self.semantic_tokens = None
+        self.position_responses = {}
+
+    def reported_diagnostics(self) -> list:
+        """Whole-file diagnostics the way :meth:`get_diagnostics` reports them.
+
+        An RPC error, or a fatal error without any diagnostics, is reported
+        as a single placeholder diagnostic.
+        """
+        if self.error:
+            return [self.error]
+        if self.fatal_error and not self.diagnostics:
+            return [{"message": FATAL_ERROR_MESSAGE}]
+        return list(self.diagnostics)
 
     def is_ready(self, current_time: float | None = None) -> bool:
         """Check if diagnostics are ready, with grace period for Lean 4.22 compatibility.
@@ -117,6 +151,20 @@ class FileState:
         current_time = current_time or time.monotonic()
         return (current_time - self.last_activity) > DIAGNOSTICS_GRACE_PERIOD
 
+    def grace_deadline(self) -> float | None:
+        """Time at which :meth:`is_ready` becomes true through the grace period alone.
+
+        Returns None if readiness does not depend on the clock right now.
+        """
+        if (
+            self.complete
+            or self.processing
+            or self.diagnostics
+            or self.wait_for_diag_done
+        ):
+            return None
+        return self.last_activity + DIAGNOSTICS_GRACE_PERIOD
+
     def is_line_range_complete(
         self, start_line: int | None, end_line: int | None
     ) -> bool:
@@ -324,16 +372,17 @@ class LSPFileManager(BaseLeanLSPClient):
             dependency_build_mode (str): Whether to automatically rebuild dependencies. Defaults to "never".
         """
         uris = self._locals_to_uris(paths)
-        for path, uri in zip(paths, uris):
-            with open(self._uri_to_abs(uri), "r", encoding="utf-8") as f:
-                txt = normalize_newlines(f.read())
+        # Read everything first: a missing file must not leave earlier ones
+        # registered as open without their didOpen ever being sent.
+        texts = [read_source_file(self._uri_to_abs(uri)) for uri in uris]
 
-            # Initialize file state
-            with self._opened_files_lock:
+        with self._opened_files_lock:
+            for path, uri, txt in zip(paths, uris, texts):
                 self._recently_closed.discard(path)
                 self.opened_files[path] = FileState(uri=uri, content=txt)
 
-            params = {
+        params_list = [
+            {
                 "textDocument": {
                     "uri": uri,
                     "text": txt,
@@ -342,7 +391,10 @@ class LSPFileManager(BaseLeanLSPClient):
                 },
                 "dependencyBuildMode": dependency_build_mode,
             }
-            self._send_notification("textDocument/didOpen", params)
+            for uri, txt in zip(uris, texts)
+        ]
+        # One write for the whole batch: the server starts all workers together.
+        self._send_notifications("textDocument/didOpen", params_list)
 
     def _send_request(
         self, path: str, method: str, params: dict, timeout: float = 30.0
@@ -386,18 +438,9 @@ class LSPFileManager(BaseLeanLSPClient):
             raise EOFError("LeanLSPClient: Language server closed unexpectedly.")
         except TimeoutError:
             return {"error": {"message": f"Request timed out after {timeout}s"}}
-        except Exception as e:
+        except LSPResponseError as e:
             # Return error in dict format for backward compatibility
-            if "LSP Error:" in str(e):
-                error_msg = str(e).replace("LSP Error: ", "")
-                import ast
-
-                try:
-                    error_dict = ast.literal_eval(error_msg)
-                    return {"error": error_dict}
-                except Exception:
-                    return {"error": {"message": str(e)}}
-            raise
+            return {"error": e.error}
 
     def _send_request_retry(
         self,
@@ -406,6 +449,7 @@ class LSPFileManager(BaseLeanLSPClient):
         params: dict,
         max_retries: int = 1,
         retry_delay: float = 0.0,
+        max_delay: float = RETRY_MAX_DELAY,
     ) -> Any:
         """Send requests until no new results are found after a number of retries.
 
@@ -414,7 +458,9 @@ class LSPFileManager(BaseLeanLSPClient):
             method (str): Method name.
             params (dict): Parameters for the method.
             max_retries (int): Number of times to retry if no new results were found. Defaults to 1.
-            retry_delay (float): Time to wait between retries. Defaults to 0.0.
+            retry_delay (float): Base time to wait between retries. Doubles after every
+                unchanged result (up to ``max_delay``) with random jitter. Defaults to 0.0.
+            max_delay (float): Upper bound for a single wait. Defaults to ``RETRY_MAX_DELAY``.
 
         Returns:
             dict: Final response.
@@ -431,14 +477,18 @@ class LSPFileManager(BaseLeanLSPClient):
                 retry_count += 1
                 if retry_count > max_retries:
                     break
-                time.sleep(retry_delay)
+                if retry_delay > 0:
+                    delay = min(retry_delay * 2 ** (retry_count - 1), max_delay)
+                    time.sleep(delay * random.uniform(0.5, 1.0))
             else:
                 retry_count = 0
                 prev_results = results
 
         return results
 
-    def _ensure_file_processed(self, path: str) -> tuple[str, int]:
+    def _ensure_file_processed(
+        self, path: str, inactivity_timeout: float = 5.0
+    ) -> tuple[str, int]:
         """Open ``path`` if needed, wait until processed, return (uri, version).
 
         Shared by document-wide requests (e.g. document symbols, folding ranges)
@@ -446,6 +496,7 @@ class LSPFileManager(BaseLeanLSPClient):
 
         Args:
             path (str): Relative file path.
+            inactivity_timeout (float): Maximum time to wait since last activity. Defaults to 5 seconds.
 
         Returns:
             tuple[str, int]: The file URI and its current version.
@@ -465,7 +516,7 @@ class LSPFileManager(BaseLeanLSPClient):
             need_wait = not state.complete
 
         if need_wait:
-            self._wait_for_diagnostics([uri], inactivity_timeout=5.0)
+            self._wait_for_diagnostics([uri], inactivity_timeout=inactivity_timeout)
             with self._opened_files_lock:
                 version = self.opened_files[path].version
 
@@ -511,8 +562,7 @@ class LSPFileManager(BaseLeanLSPClient):
                 # Sync from disk using update
                 for path in already_open:
                     abs_path = self._uri_to_abs(self._local_to_uri(path))
-                    with open(abs_path, "r", encoding="utf-8") as f:
-                        new_content = normalize_newlines(f.read())
+                    new_content = read_source_file(abs_path)
 
                     with self._opened_files_lock:
                         state = self.opened_files[path]
@@ -666,9 +716,11 @@ class LSPFileManager(BaseLeanLSPClient):
             for path in paths:
                 self._recently_closed.add(path)
 
+        # One write for all didClose notifications
+        self._send_notifications(
+            "textDocument/didClose", [{"textDocument": {"uri": uri}} for uri in uris]
+        )
         for uri in uris:
-            params = {"textDocument": {"uri": uri}}
-            self._send_notification("textDocument/didClose", params)
             # Release RPC session to prevent stale sessions
             self._rpc_release_session(uri)
 
@@ -834,11 +886,7 @@ class LSPFileManager(BaseLeanLSPClient):
             if state.fatal_error:
                 return DiagnosticsResult(
                     success=False,
-                    diagnostics=[
-                        {
-                            "message": "leanclient: Received LeanFileProgressKind.fatalError."
-                        }
-                    ],
+                    diagnostics=[{"message": FATAL_ERROR_MESSAGE}],
                     timed_out=not wait_completed,
                 )
 
@@ -852,6 +900,9 @@ class LSPFileManager(BaseLeanLSPClient):
     def get_file_content(self, path: str) -> str:
         """Get the content of a file as seen by the language server.
 
+        Returns the in-memory document (including unsaved updates) without
+        touching the disk or copying the text.
+
         Args:
             path (str): Relative file path.
 
@@ -926,6 +977,13 @@ class LSPFileManager(BaseLeanLSPClient):
                 "textDocument/waitForDiagnostics", params
             )
 
+        # A finished waitForDiagnostics request wakes the waiter just like a
+        # notification does, so there is no need to poll the futures.
+        for future in futures_by_uri.values():
+            self._loop.call_soon_threadsafe(
+                future.add_done_callback, self._notify_waiters
+            )
+
         # Wait for completion with adaptive timeout using condition variable
         start_time = time.monotonic()
         pending_uris = set(uris_needing_wait)
@@ -1008,14 +1066,44 @@ class LSPFileManager(BaseLeanLSPClient):
                     )
                     return False
 
-                # Wake up on notification or after the poll interval, whichever
-                # comes first (notifications drive progress; the timeout only
-                # bounds time-based readiness re-checks).
-                self._close_condition.wait(timeout=WAIT_POLL_INTERVAL)
+                # Sleep until a notification or finished request arrives, or
+                # until the next time-based check is due.
+                deadline = start_time + max_timeout
+                if not any_rpc_pending:
+                    deadline = min(
+                        deadline, current_time + inactivity_timeout - max_inactivity
+                    )
+                self._close_condition.wait(
+                    timeout=self._wait_timeout(
+                        pending_uris, path_by_uri, current_time, deadline
+                    )
+                )
 
         # Should not reach here, but return False as safety
         return False
 
+    def _notify_waiters(self, _future=None) -> None:
+        """Wake threads blocked on the close condition."""
+        with self._close_condition:
+            self._close_condition.notify_all()
+
+    def _wait_timeout(
+        self,
+        pending_uris: set[str],
+        path_by_uri: dict[str, str],
+        current_time: float,
+        deadline: float,
+    ) -> float:
+        """Seconds to block before the next time-based readiness check is due.
+
+        Must be called with the close condition held.
+        """
+        for uri in pending_uris:
+            grace = self.opened_files[path_by_uri[uri]].grace_deadline()
+            if grace is not None:
+                deadline = min(deadline, grace)
+        return min(max(deadline - current_time, 0.001), WAIT_POLL_INTERVAL)
+
     def _wait_for_line_range(
         self,
         uris: list[str],
@@ -1116,8 +1204,13 @@ class LSPFileManager(BaseLeanLSPClient):
                     return False
 
                 # Wait for line range completion (notification-driven; the
-                # timeout only bounds time-based readiness re-checks).
-                self._close_condition.wait(timeout=WAIT_POLL_INTERVAL)
+                # timeout only covers time-based readiness re-checks).
+                deadline = current_time + inactivity_timeout - max_inactivity
+                self._close_condition.wait(
+                    timeout=self._wait_timeout(
+                        pending_uris, path_by_uri, current_time, deadline
+                    )
+                )
 
         # Should not reach here, but return False as safety
         return False
@@ -1,4 +1,5 @@
 from pathlib import Path
+from typing import Any
 
 import leanclient
 from leanclient.utils import DocumentContentChange, experimental
@@ -14,9 +15,15 @@ class SingleFileClient:
     Args:
         client(LeanLSPClient): The LeanLSPClient instance to use.
         file_path(str): The path to the file to interact with.
+        eager_open(bool): Open the file right away, so the server elaborates it while the first query is prepared. Defaults to False.
     """
 
-    def __init__(self, client: "leanclient.client.LeanLSPClient", file_path: str):
+    def __init__(
+        self,
+        client: "leanclient.client.LeanLSPClient",
+        file_path: str,
+        eager_open: bool = False,
+    ):
         file_path = client._normalize_local_path(file_path)
 
         # Check if file exists
@@ -26,6 +33,8 @@ class SingleFileClient:
 
         self.client = client
         self.file_path = file_path
+        if eager_open:
+            client.open_file(file_path)
 
     def build_project(self, get_cache: bool = True):
         """Build the Lean project by running `lake build`.
@@ -131,22 +140,36 @@ class SingleFileClient:
         """See :meth:`leanclient.client.LeanLSPClient.get_document_highlights`"""
         return self.client.get_document_highlights(self.file_path, line, character)
 
-    def get_semantic_tokens(self) -> list:
+    def get_semantic_tokens(self, as_array: bool = False) -> Any:
         """See :meth:`leanclient.client.LeanLSPClient.get_semantic_tokens`"""
-        return self.client.get_semantic_tokens(self.file_path)
+        return self.client.get_semantic_tokens(self.file_path, as_array)
 
     def get_semantic_tokens_range(
-        self, start_line: int, start_character: int, end_line: int, end_character: int
-    ) -> list:
+        self,
+        start_line: int,
+        start_character: int,
+        end_line: int,
+        end_character: int,
+        as_array: bool = False,
+    ) -> Any:
         """See :meth:`leanclient.client.LeanLSPClient.get_semantic_tokens_range`"""
         return self.client.get_semantic_tokens_range(
-            self.file_path, start_line, start_character, end_line, end_character
+            self.file_path,
+            start_line,
+            start_character,
+            end_line,
+            end_character,
+            as_array,
         )
 
     def get_folding_ranges(self) -> list:
         """See :meth:`leanclient.client.LeanLSPClient.get_folding_ranges`"""
         return self.client.get_folding_ranges(self.file_path)
 
+    def get_document_requests(self, methods: list[str], timeout: float = 120.0) -> list:
+        """See :meth:`leanclient.client.LeanLSPClient.get_document_requests`"""
+        return self.client.get_document_requests(self.file_path, methods, timeout)
+
     @experimental
     def get_call_hierarchy_items(self, line: int, character: int) -> list:
         """See :meth:`leanclient.client.LeanLSPClient.get_call_hierarchy_items`"""
@@ -171,11 +194,21 @@ class SingleFileClient:
         return self.client.get_term_goal(self.file_path, line, character)
 
     def get_code_actions(
-        self, start_line: int, start_character: int, end_line: int, end_character: int
+        self,
+        start_line: int,
+        start_character: int,
+        end_line: int,
+        end_character: int,
+        require_diagnostics: bool = False,
     ) -> list:
         """See :meth:`leanclient.client.LeanLSPClient.get_code_actions`"""
         return self.client.get_code_actions(
-            self.file_path, start_line, start_character, end_line, end_character
+            self.file_path,
+            start_line,
+            start_character,
+            end_line,
+            end_character,
+            require_diagnostics=require_diagnostics,
         )
 
     def get_code_action_resolve(self, code_action: dict) -> dict:
@@ -68,12 +68,64 @@ class SemanticTokenProcessor:
             tokens.append([line, char, length, types[token]])
         return tokens
 
+    def decode_array(self, raw_response: list[int]) -> Any:
+        """Decode semantic tokens into a NumPy array instead of Python lists.
+
+        Delta decoding runs as vectorized prefix sums, and the result is an
+        ``(N, 4)`` int32 array of ``[line, char, length, token_type]`` rows where
+        ``token_type`` indexes :attr:`token_types`. Requires NumPy
+        (``pip install leanclient[numpy]``).
+
+        Args:
+            raw_response (list[int]): Encoded ``data`` of a semantic tokens response.
+
+        Returns:
+            numpy.ndarray: Decoded tokens, shape ``(N, 4)``.
+        """
+        try:
+            import numpy as np
+        except ImportError as e:
+            raise ImportError(
+                "decode_array requires NumPy: pip install leanclient[numpy]"
+            ) from e
+
+        data = np.fromiter(
+            raw_response, dtype=np.int32, count=len(raw_response)
+        ).reshape(-1, 5)
+        # Every column is written in place into the result: no stacking copy.
+        tokens = np.empty((len(data), 4), dtype=np.int32)
+        d_line, d_char = data[:, 0], data[:, 1]
+        np.cumsum(d_line, out=tokens[:, 0])
+        # Start columns accumulate within a run of tokens on the same line and
+        # restart at every token with a non-zero line delta.
+        char_sums = np.cumsum(d_char, dtype=np.int64)
+        run_start = np.zeros(len(data), dtype=np.intp)
+        new_lines = np.flatnonzero(d_line)
+        run_start[new_lines] = new_lines
+        np.maximum.accumulate(run_start, out=run_start)
+        tokens[:, 1] = char_sums - (char_sums[run_start] - d_char[run_start])
+        tokens[:, 2:] = data[:, 2:4]
+        return tokens
+
 
 def normalize_newlines(text: str) -> str:
     """Convert CRLF sequences to LF for stable indexing."""
     return text.replace("\r\n", "\n")
 
 
+def read_source_file(path: str | Path) -> str:
+    """Read a UTF-8 source file with newlines normalized to LF.
+
+    Same result as reading in text mode (universal newlines), but decodes the
+    whole file in one step and skips newline translation for LF-only files.
+    """
+    with open(path, "rb") as f:
+        text = f.read().decode("utf-8")
+    if "\r" in text:
+        text = text.replace("\r\n", "\n").replace("\r", "\n")
+    return text
+
+
 def _utf16_len(char: str) -> int:
     """Return the UTF-16 length of a single character (1 or 2 code units)."""
     code_point = ord(char)
@@ -81,52 +133,50 @@ def _utf16_len(char: str) -> int:
     return 2 if code_point > 0xFFFF else 1
 
 
-def _utf16_pos_to_utf8_pos(text: str, line: int, utf16_character: int) -> int:
-    """
-    Convert LSP position (line, UTF-16 character offset) to UTF-8 byte index.
-
-    This matches the Lean LSP server implementation:
-    - line is 0-indexed
-    - character is a UTF-16 code unit offset
-    - character is accepted liberally: actual character := min(line length, character)
-
-    Args:
-        text: The text content (UTF-8 encoded, with LF newlines)
-        line: 0-indexed line number
-        utf16_character: UTF-16 code unit offset within the line
+def _line_start(text: str, line: int, index: int = 0) -> int:
+    """Index of the line ``line`` lines below the one starting at ``index``.
 
-    Returns:
-        UTF-8 byte offset into text
+    Returns -1 if ``text`` has fewer lines.
     """
-    if line < 0:
-        return 0
+    for _ in range(line):
+        index = text.find("\n", index) + 1
+        if not index:
+            return -1
+    return index
 
-    lines = text.split("\n")
-    if line >= len(lines):
-        return len(text.encode("utf-8"))
 
-    # Get byte offset to start of line (count UTF-8 bytes of preceding lines)
-    line_start_byte = sum(
-        len(lines[i].encode("utf-8")) + 1 for i in range(line)
-    )  # +1 for '\n'
+def _index_in_line(text: str, line_start: int, character: int) -> int:
+    """Index of a UTF-16 ``character`` offset in the line at ``line_start``."""
+    line_end = text.find("\n", line_start)
+    if line_end < 0:
+        line_end = len(text)
 
-    # Convert UTF-16 character offset to UTF-8 byte offset within the line
-    line_content = lines[line]
-    utf16_offset = 0
-    utf8_offset = 0
+    line_content = text[line_start:line_end]
+    if line_content.isascii():
+        return line_start + min(character, len(line_content))
 
+    utf16_offset = 0
+    offset = 0
     for char in line_content:
-        if utf16_offset >= utf16_character:
+        if utf16_offset >= character:
             break
         utf16_offset += _utf16_len(char)
-        utf8_offset += len(char.encode("utf-8"))
-
-    return line_start_byte + utf8_offset
+        offset += 1
+    return line_start + offset
 
 
 def _index_from_line_character(text: str, line: int, character: int) -> int:
     """
-    Convert LSP position to UTF-8 byte index.
+    Convert LSP position to an index into ``text``.
+
+    This matches the Lean LSP server implementation:
+    - line is 0-indexed; negative lines clamp to the start of the text and
+      lines past the end to its end
+    - character is a UTF-16 code unit offset, accepted liberally:
+      actual character := min(line length, character)
+
+    The result counts code points, so edits can be spliced without
+    re-encoding the text.
 
     Args:
         text: The text content
@@ -134,12 +184,17 @@ def _index_from_line_character(text: str, line: int, character: int) -> int:
         character: UTF-16 code unit offset
 
     Returns:
-        UTF-8 byte index
+        Index into ``text``
     """
-    return _utf16_pos_to_utf8_pos(text, line, character)
+    if line < 0:
+        return 0
+    line_start = _line_start(text, line)
+    if line_start < 0:
+        return len(text)
+    return _index_in_line(text, line_start, character)
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class DocumentContentChange:
     """Represents a change in a document."""
 
@@ -197,14 +252,20 @@ def apply_changes_to_text(text: str, changes: list[DocumentContentChange]) -> st
             continue
 
         assert change.start is not None and change.end is not None
-        # Indices are UTF-8 byte offsets, so splice on the encoded bytes to keep
-        # positions correct for lines containing non-ASCII characters.
-        data = text.encode("utf-8")
-        start_idx = _index_from_line_character(text, change.start[0], change.start[1])
-        end_idx = _index_from_line_character(text, change.end[0], change.end[1])
-        text = (data[:start_idx] + change.text.encode("utf-8") + data[end_idx:]).decode(
-            "utf-8"
-        )
+        (start_line, start_char), (end_line, end_char) = change.start, change.end
+        line_start = _line_start(text, start_line) if start_line >= 0 else -1
+        if line_start < 0 or end_line < start_line:
+            start_idx = _index_from_line_character(text, start_line, start_char)
+            end_idx = _index_from_line_character(text, end_line, end_char)
+        else:
+            # Walk on from the start line instead of rescanning from the top
+            start_idx = _index_in_line(text, line_start, start_char)
+            line_start = _line_start(text, end_line - start_line, line_start)
+            if line_start < 0:
+                end_idx = len(text)
+            else:
+                end_idx = _index_in_line(text, line_start, end_char)
+        text = text[:start_idx] + change.text + text[end_idx:]
 
     return text
 
@@ -276,15 +337,22 @@ def needs_mathlib_cache_get(project_path: Path) -> bool:
 
 
 def experimental(func):
-    """Decorator to mark a method as experimental."""
+    """Decorator to mark a method as experimental.
+
+    The warning is logged on the first call only.
+    """
+    warned = False
 
     @wraps(func)
     def wrapper(self, *args, **kwargs):
-        logger.warning("%s() is experimental! Use with caution.", func.__name__)
+        nonlocal warned
+        if not warned:
+            warned = True
+            logger.warning("%s() is experimental! Use with caution.", func.__name__)
         return func(self, *args, **kwargs)
 
     # Change __doc__ to include a sphinx warning
-    warning = "\n        .. admonition:: Experimental\n\n            This method is experimental. Use with caution.\n            Warnings are logged via the 'leanclient' logger.\n"
+    warning = "\n        .. admonition:: Experimental\n\n            This method is experimental. Use with caution.\n            A warning is logged once via the 'leanclient' logger.\n"
     doc_lines = (wrapper.__doc__ or "").split("\n")
     doc_lines.insert(1, warning)
     wrapper.__doc__ = "\n".join(doc_lines)
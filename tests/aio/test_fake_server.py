@@ -11,8 +11,10 @@ Plain ``asyncio.run`` wrappers (no pytest-asyncio dependency in this repo).
 from __future__ import annotations
 
 import asyncio
+import gc
 import sys
 from pathlib import Path
+from types import SimpleNamespace
 
 import pytest
 
@@ -22,7 +24,10 @@ from leanclient.aio import (  # noqa: E402
     AsyncLeanLSPClient,
     LeanRequestCancelled,
     LeanRequestTimeout,
+    LeanRpcError,
+    LeanServerPool,
     LeanTransportError,
+    ScratchPool,
 )
 from leanclient.aio.transport import LspTransport  # noqa: E402
 
@@ -57,6 +62,129 @@ def test_happy_roundtrip():
     asyncio.run(run())
 
 
+def test_request_many_returns_results_in_call_order():
+    async def run():
+        t = await _started("happy")
+        writes = 0
+        original = t._proc.stdin.write
+
+        def counting_write(data):
+            nonlocal writes
+            writes += 1
+            return original(data)
+
+        t._proc.stdin.write = counting_write
+        results = await t.request_many(
+            [("textDocument/hover", {}), ("textDocument/definition", {})]
+        )
+        assert writes == 1
+        assert [r["echo"] for r in results] == [
+            "textDocument/hover",
+            "textDocument/definition",
+        ]
+        await t.close()
+
+    asyncio.run(run())
+
+
+def test_concurrent_requests_coalesce_into_one_write():
+    async def run():
+        t = await _started("happy")
+        writes = []
+        original = t._proc.stdin.write
+
+        def recording_write(data):
+            writes.append(data)
+            return original(data)
+
+        t._proc.stdin.write = recording_write
+        results = await asyncio.gather(
+            t.request("textDocument/hover", {}),
+            t.request("$/lean/plainGoal", {}),
+            t.notify("textDocument/didSave", {}),
+        )
+        assert len(writes) == 1
+        assert writes[0].count(b"Content-Length") == 3
+        assert [r["echo"] for r in results[:2]] == [
+            "textDocument/hover",
+            "$/lean/plainGoal",
+        ]
+        await t.close()
+
+    asyncio.run(run())
+
+
+def test_cancelled_writer_takes_its_frames_back():
+    async def run():
+        t = await _started("happy")
+        writes = []
+        original = t._proc.stdin.write
+
+        def recording_write(data):
+            writes.append(data)
+            return original(data)
+
+        t._proc.stdin.write = recording_write
+        async with t._write_lock:
+            queued = asyncio.ensure_future(t.notify("textDocument/didSave", {}))
+            await asyncio.sleep(0)
+            assert len(t._outbox) == 1
+            queued.cancel()
+            with pytest.raises(asyncio.CancelledError):
+                await queued
+            assert t._outbox == []
+
+        await t.request("textDocument/hover", {})
+        assert len(writes) == 1
+        assert b"didSave" not in writes[0]
+        await t.close()
+
+    asyncio.run(run())
+
+
+def test_request_many_failure_retrieves_other_errors():
+    async def run():
+        t = await _started("happy")
+        unhandled = []
+        asyncio.get_running_loop().set_exception_handler(
+            lambda loop, context: unhandled.append(context)
+        )
+        write = t._write
+
+        async def hold(*payloads):
+            pass
+
+        t._write = hold
+        batch = asyncio.ensure_future(
+            t.request_many([("textDocument/hover", {}), ("$/lean/plainGoal", {})])
+        )
+        await asyncio.sleep(0)
+        futures = list(t._futures.values())
+        for fut in futures:
+            fut.set_exception(LeanRpcError(-32603, "boom"))
+        with pytest.raises(LeanRpcError):
+            await batch
+        del futures, fut
+        gc.collect()
+        assert unhandled == []
+        t._write = write
+        await t.close()
+
+    asyncio.run(run())
+
+
+def test_request_many_timeout_abandons_all():
+    async def run():
+        t = await _started("cancel_ack")
+        with pytest.raises(LeanRequestTimeout):
+            await t.request_many([("a", {}), ("b", {})], timeout=0.5)
+        assert t._futures == {}
+        assert t.alive
+        await t.close()
+
+    asyncio.run(run())
+
+
 def test_malformed_header_fails_pending_and_future_requests():
     """A garbage header must fail the in-flight request typed — never hang —
     and subsequent requests must fail instantly."""
@@ -142,6 +270,26 @@ def test_huge_message_survives():
     asyncio.run(run())
 
 
+def test_reader_parses_frames_split_across_chunks():
+    async def run():
+        seen = []
+        t = _transport("happy", lambda m, p: seen.append(p["n"]))
+        rd = asyncio.StreamReader()
+        t._proc = SimpleNamespace(stdout=rd, returncode=None)
+        frames = b"".join(
+            b"Content-Type: x\r\nContent-Length: %d\r\n\r\n" % len(body) + body
+            for body in (b'{"method":"m","params":{"n":%d}}' % n for n in range(3))
+        )
+        for i in range(0, len(frames), 7):
+            rd.feed_data(frames[i : i + 7])
+        rd.feed_eof()
+        await t._read_loop()
+        assert seen == [0, 1, 2]
+        assert "closed the connection" in str(t._death)
+
+    asyncio.run(run())
+
+
 def test_timeout_sends_cancel_and_raises():
     """A timed-out request raises LeanRequestTimeout and a $/cancelRequest is
     sent; the server's -32800 acknowledgement is a *response to an abandoned
@@ -224,6 +372,332 @@ def test_client_open_update_barrier_against_fake(tmp_path: Path):
     asyncio.run(run())
 
 
+def test_client_open_many_reads_files_concurrently(tmp_path: Path):
+    async def run():
+        project = _project(tmp_path)
+        (project / "A.lean").write_text("def a := 1\n")
+        (project / "B.lean").write_text("def b := 2\n")
+        client = AsyncLeanLSPClient(
+            str(project), server_command=[sys.executable, FAKE, "happy"]
+        )
+        await client.start()
+        opens = 0
+        notify = client._transport.notify
+
+        async def counting_notify(method, params):
+            nonlocal opens
+            opens += method == "textDocument/didOpen"
+            await notify(method, params)
+
+        client._transport.notify = counting_notify
+        docs = await client.open_many(["A.lean", "B.lean", "A.lean"])
+        assert [d.path for d in docs] == ["A.lean", "B.lean", "A.lean"]
+        assert docs[1].text == "def b := 2\n"
+        assert docs[0] is docs[2]
+        assert opens == 2
+        await client.close()
+
+    asyncio.run(run())
+
+
+def test_client_close_many_coalesces_didclose(tmp_path: Path):
+    async def run():
+        project = _project(tmp_path)
+        (project / "A.lean").write_text("def a := 1\n")
+        (project / "B.lean").write_text("def b := 2\n")
+        client = AsyncLeanLSPClient(
+            str(project), server_command=[sys.executable, FAKE, "happy"]
+        )
+        await client.start()
+        await client.open_many(["A.lean", "B.lean"], wait=False)
+        writes = []
+        stdin = client._transport._proc.stdin
+        original = stdin.write
+
+        def recording_write(data):
+            writes.append(data)
+            return original(data)
+
+        stdin.write = recording_write
+        await client.close_many(["A.lean", "B.lean", "C.lean"])
+        assert len(writes) == 1
+        assert writes[0].count(b"textDocument/didClose") == 2
+        assert client._docs == {}
+        await client.close()
+
+    asyncio.run(run())
+
+
+def test_client_batch_position_requests(tmp_path: Path):
+    async def run():
+        client = AsyncLeanLSPClient(
+            str(_project(tmp_path)),
+            server_command=[sys.executable, FAKE, "happy"],
+        )
+        await client.start()
+        await client.open("Foo.lean", text="def x := 1\n")
+        hover, definition = await client.batch(
+            [
+                ("Foo.lean", "textDocument/hover", 0, 4),
+                ("Foo.lean", "textDocument/definition", 0, 4),
+            ]
+        )
+        assert hover["echo"] == "textDocument/hover"
+        assert definition["echo"] == "textDocument/definition"
+        await client.close()
+
+    asyncio.run(run())
+
+
+def test_client_batch_converts_ranges_and_passes_timeout(tmp_path: Path):
+    async def run():
+        client = AsyncLeanLSPClient(
+            str(_project(tmp_path)),
+            server_command=[sys.executable, FAKE, "happy"],
+        )
+        await client.start()
+        doc = await client.open("Foo.lean", text="def 𝕜x := 1\n")
+        doc.barrier_version = None  # force a barrier for the batch
+        utf16 = {
+            "start": {"line": 0, "character": 4},
+            "end": {"line": 0, "character": 7},
+        }
+        codepoints = {
+            "start": {"line": 0, "character": 4},
+            "end": {"line": 0, "character": 6},
+        }
+        barrier_timeouts = []
+        barrier = client.barrier
+
+        async def spy_barrier(path, timeout=None):
+            barrier_timeouts.append(timeout)
+            await barrier(path, timeout=timeout)
+
+        async def request_many(requests, timeout=None):
+            return [
+                {"contents": "x", "range": dict(utf16)},
+                [{"uri": doc.uri, "range": dict(utf16)}],
+                None,
+            ]
+
+        client.barrier = spy_barrier
+        client._transport.request_many = request_many
+        hover, definition, goal = await client.batch(
+            [
+                ("Foo.lean", "textDocument/hover", 0, 5),
+                ("Foo.lean", "textDocument/definition", 0, 5),
+                ("Foo.lean", "$/lean/plainGoal", 0, 5),
+            ],
+            timeout=7.0,
+        )
+        assert barrier_timeouts == [7.0]
+        assert hover["range"] == codepoints
+        assert definition[0]["range"] == codepoints
+        assert definition[0]["path"] == "Foo.lean"
+        assert goal is None
+        await client.close()
+
+    asyncio.run(run())
+
+
+def test_client_query_at_fans_out_after_one_barrier(tmp_path: Path):
+    async def run():
+        client = AsyncLeanLSPClient(
+            str(_project(tmp_path)),
+            server_command=[sys.executable, FAKE, "happy"],
+        )
+        await client.start()
+        await client.open("Foo.lean", text="def x := 1\n", wait=False)
+        methods = []
+        original = client._transport.request
+
+        async def spy(method, params, *args, **kwargs):
+            methods.append(method)
+            return await original(method, params, *args, **kwargs)
+
+        setattr(client._transport, "request", spy)
+        res = await client.query_at("Foo.lean", 0, 4, kinds=("hover", "termGoal"))
+        assert res["hover"]["echo"] == "textDocument/hover"
+        assert res["termGoal"]["echo"] == "$/lean/plainTermGoal"
+        assert methods.count("textDocument/waitForDiagnostics") == 1
+        with pytest.raises(ValueError):
+            await client.query_at("Foo.lean", 0, 4, kinds=("references",))
+        await client.close()
+
+    asyncio.run(run())
+
+
+def test_scratch_pool_reuses_most_recent_slot(tmp_path: Path):
+    async def run():
+        client = AsyncLeanLSPClient(
+            str(_project(tmp_path)),
+            server_command=[sys.executable, FAKE, "happy"],
+        )
+        await client.start()
+        pool = ScratchPool(client, header="import Foo\n", size=3)
+        updated = []
+        original = client.update
+
+        async def spy(path, text, *args, **kwargs):
+            updated.append(path)
+            return await original(path, text, *args, **kwargs)
+
+        setattr(client, "update", spy)
+        for body in ("a", "b", "c"):
+            await pool.run(body)
+        assert len(set(updated)) == 1
+        await pool.close()
+        await client.close()
+
+    asyncio.run(run())
+
+
+def test_client_caches_settled_position_responses(tmp_path: Path):
+    async def run():
+        client = AsyncLeanLSPClient(
+            str(_project(tmp_path)),
+            server_command=[sys.executable, FAKE, "happy"],
+        )
+        await client.start()
+        await client.open("Foo.lean", text="def x := 1\n")
+        first = await client.hover("Foo.lean", 0, 4)
+        first["echo"] = "mutated by caller"
+        second = await client.hover("Foo.lean", 0, 4)
+        assert second["n"] == first["n"]
+        assert second["echo"] == "textDocument/hover"
+
+        await client.update("Foo.lean", "def x := 2\n")
+        third = await client.hover("Foo.lean", 0, 4)
+        assert third["n"] > first["n"]
+
+        await client.close_file("Foo.lean")
+        assert client._response_cache == {}
+        await client.close()
+
+    asyncio.run(run())
+
+
+def test_client_reuses_responses_above_an_edit(tmp_path: Path):
+    async def run():
+        client = AsyncLeanLSPClient(
+            str(_project(tmp_path)),
+            server_command=[sys.executable, FAKE, "happy"],
+            reuse_unedited_responses=True,
+        )
+        await client.start()
+        text = "def x := 1\n\ndef y := 2\n"
+        await client.open("Foo.lean", text=text)
+        above = await client.hover("Foo.lean", 0, 4)
+        below = await client.hover("Foo.lean", 2, 4)
+
+        await client.update("Foo.lean", text.replace("2", "3"))
+        assert (await client.hover("Foo.lean", 0, 4))["n"] == above["n"]
+        assert (await client.hover("Foo.lean", 2, 4))["n"] > below["n"]
+
+        # An edit above drops everything below it.
+        await client.update("Foo.lean", "def x := 5\n\ndef y := 3\n")
+        assert (await client.hover("Foo.lean", 0, 4))["n"] > above["n"]
+        await client.close()
+
+    asyncio.run(run())
+
+
+def test_client_identical_concurrent_requests_share_one_call(tmp_path: Path):
+    async def run():
+        client = AsyncLeanLSPClient(
+            str(_project(tmp_path)),
+            server_command=[sys.executable, FAKE, "happy"],
+        )
+        await client.start()
+        await client.open("Foo.lean", text="def x := 1\n", wait=False)
+        first, second, other = await asyncio.gather(
+            client.term_goal("Foo.lean", 0, 4, fresh=False),
+            client.term_goal("Foo.lean", 0, 4, fresh=False),
+            client.term_goal("Foo.lean", 0, 5, fresh=False),
+        )
+        assert first == second
+        assert first is not second
+        assert other["n"] != first["n"]
+        assert client._inflight == {}
+        await client.close()
+
+    asyncio.run(run())
+
+
+def test_client_debounced_hover_keeps_only_latest(tmp_path: Path):
+    async def run():
+        client = AsyncLeanLSPClient(
+            str(_project(tmp_path)),
+            server_command=[sys.executable, FAKE, "happy"],
+            debounce_ms=50,
+        )
+        await client.start()
+        await client.open("Foo.lean", text="def x := 1\n", wait=False)
+        results = await asyncio.gather(
+            *(client.hover("Foo.lean", 0, col, fresh=False) for col in range(3)),
+            return_exceptions=True,
+        )
+        assert all(isinstance(r, LeanRequestCancelled) for r in results[:2])
+        assert results[2]["echo"] == "textDocument/hover"
+        assert client._debounce_waiters == {}
+        await client.close()
+
+    asyncio.run(run())
+
+
+def test_client_hover_many_returns_results_in_order(tmp_path: Path):
+    async def run():
+        client = AsyncLeanLSPClient(
+            str(_project(tmp_path)),
+            server_command=[sys.executable, FAKE, "happy"],
+            debounce_ms=50,
+        )
+        await client.start()
+        await client.open("Foo.lean", text="def x := 1\n")
+        positions = [(0, col) for col in range(6)]
+        hovers = await client.hover_many("Foo.lean", positions, max_concurrency=2)
+        assert [h["echo"] for h in hovers] == ["textDocument/hover"] * 6
+        assert len({h["n"] for h in hovers}) == 6
+        goals = await client.goal_many("Foo.lean", positions[:2])
+        assert [g.status for g in goals] == ["complete", "complete"]
+        await client.close()
+
+    asyncio.run(run())
+
+
+def test_server_pool_reuses_started_client(tmp_path: Path):
+    async def run():
+        project = str(_project(tmp_path))
+        pool = LeanServerPool(server_command=[sys.executable, FAKE, "happy"])
+        first, second = await asyncio.gather(
+            pool.acquire(project), pool.acquire(project)
+        )
+        assert first is second
+        assert first.alive
+        await first.close()  # a dead server is replaced on next acquire
+        third = await pool.acquire(project)
+        assert third is not first
+        assert third.alive
+        await pool.close()
+        assert not third.alive
+
+    asyncio.run(run())
+
+
+def test_server_pool_prewarms_projects(tmp_path: Path):
+    async def run():
+        (tmp_path / "a").mkdir()
+        (tmp_path / "b").mkdir()
+        projects = [str(_project(tmp_path / name)) for name in ("a", "b")]
+        pool = LeanServerPool(server_command=[sys.executable, FAKE, "happy"])
+        warm = await pool.prewarm(projects)
+        assert [c.alive for c in warm] == [True, True]
+        assert await pool.acquire(projects[1]) is warm[1]
+        await pool.close()
+
+    asyncio.run(run())
+
+
 def test_client_default_command_disables_report_delay(tmp_path: Path):
     project = str(_project(tmp_path))
     client = AsyncLeanLSPClient(project)
@@ -306,6 +780,126 @@ def test_client_reuses_barrier_for_unchanged_version(tmp_path: Path):
     asyncio.run(run())
 
 
+def test_client_concurrent_barriers_share_one_request(tmp_path: Path):
+    async def run():
+        client = AsyncLeanLSPClient(
+            str(_project(tmp_path)),
+            server_command=[sys.executable, FAKE, "happy"],
+        )
+        await client.start()
+        await client.open("Foo.lean", text="def x := 1\n", wait=False)
+        barriers = 0
+        original = client._transport.request
+
+        async def spy(method, params, *args, **kwargs):
+            nonlocal barriers
+            if method == "textDocument/waitForDiagnostics":
+                barriers += 1
+            return await original(method, params, *args, **kwargs)
+
+        setattr(client._transport, "request", spy)
+        await asyncio.gather(*(client.barrier("Foo.lean") for _ in range(5)))
+        assert barriers == 1
+        assert client._barriers == {}
+        await client.close()
+
+    asyncio.run(run())
+
+
+def test_client_shared_barrier_applies_each_callers_timeout(tmp_path: Path):
+    async def run():
+        client = AsyncLeanLSPClient(
+            str(_project(tmp_path)),
+            server_command=[sys.executable, FAKE, "happy"],
+        )
+        await client.start()
+        await client.open("Foo.lean", text="def x := 1\n", wait=False)
+        timeouts = []
+        original = client._transport.request
+
+        async def slow(method, params, *args, **kwargs):
+            if method == "textDocument/waitForDiagnostics":
+                timeouts.append(kwargs.get("timeout"))
+                await asyncio.sleep(0.2)
+            return await original(method, params, *args, **kwargs)
+
+        setattr(client._transport, "request", slow)
+        impatient, patient = await asyncio.gather(
+            client.barrier("Foo.lean", timeout=0.05),
+            client.barrier("Foo.lean", timeout=5),
+            return_exceptions=True,
+        )
+        assert isinstance(impatient, LeanRequestTimeout)
+        assert patient is None
+        assert timeouts == [client.request_timeout]
+        await client.close()
+
+    asyncio.run(run())
+
+
+def test_client_unfresh_diagnostics_flush_debounced_change(tmp_path: Path):
+    async def run():
+        client = AsyncLeanLSPClient(
+            str(_project(tmp_path)),
+            server_command=[sys.executable, FAKE, "happy"],
+        )
+        await client.start()
+        await client.open("Foo.lean", text="def x := 1\n")
+        changes = []
+        original = client._transport.notify
+
+        async def spy(method, params):
+            if method == "textDocument/didChange":
+                changes.append(params)
+            await original(method, params)
+
+        client._transport.notify = spy
+        await client.update("Foo.lean", "def x := 2\n", debounce_ms=10_000)
+        assert changes == []
+        await client.diagnostics("Foo.lean", fresh=False)
+        assert [c["contentChanges"] for c in changes] == [[{"text": "def x := 2\n"}]]
+        await client.close()
+
+    asyncio.run(run())
+
+
+def test_client_debounced_updates_send_one_change(tmp_path: Path):
+    async def run():
+        client = AsyncLeanLSPClient(
+            str(_project(tmp_path)),
+            server_command=[sys.executable, FAKE, "happy"],
+        )
+        await client.start()
+        doc = await client.open("Foo.lean", text="def x := 1\n")
+        changes = []
+        original = client._transport.notify
+
+        async def spy(method, params):
+            if method == "textDocument/didChange":
+                changes.append(params)
+            await original(method, params)
+
+        client._transport.notify = spy
+        for i in range(2, 6):
+            await client.update("Foo.lean", f"def x := {i}\n", debounce_ms=50)
+        assert changes == []
+        assert client.content("Foo.lean") == "def x := 5\n"
+
+        await asyncio.sleep(0.2)
+        assert len(changes) == 1
+        assert changes[0]["contentChanges"] == [{"text": "def x := 5\n"}]
+        assert doc.version == 2
+
+        # A query flushes a pending change immediately.
+        await client.update("Foo.lean", "def x := 6\n", debounce_ms=10_000)
+        report = await client.diagnostics("Foo.lean")
+        assert len(changes) == 2
+        assert report.version == 3
+        await client.close()
+
+    asyncio.run(run())
+
+
 def test_client_barrier_completion_does_not_downgrade_version(tmp_path: Path):
     async def run():
         client = AsyncLeanLSPClient(
@@ -439,6 +1033,25 @@ def test_docstate_ignores_stale_version_diagnostics(tmp_path: Path):
     assert doc.diagnostics_version == 2
 
 
+def test_client_routes_document_notifications():
+    from leanclient.aio.document import DocState
+
+    client = object.__new__(AsyncLeanLSPClient)
+    doc = DocState(path="Foo.lean", uri="file:///Foo.lean", text="")
+    client._docs_by_uri = {doc.uri: doc}
+
+    client._on_notification(
+        "textDocument/publishDiagnostics",
+        {"uri": doc.uri, "version": 1, "diagnostics": [{"message": "m"}]},
+    )
+    client._on_notification(
+        "$/lean/staleDependency", {"textDocument": {"uri": doc.uri}}
+    )
+    client._on_notification("window/logMessage", {"uri": doc.uri})
+    assert doc.diagnostics == [{"message": "m"}]
+    assert doc.stale_imports
+
+
 def test_docstate_appends_incremental_diagnostics_and_resets():
     from leanclient.aio.document import DocState
 
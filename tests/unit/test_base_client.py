@@ -1,13 +1,21 @@
 """Unit tests for BaseLeanLSPClient."""
 
+import asyncio
 import io
+import sys
 import threading
+import types
 from concurrent.futures import Future
 
 import orjson
 import pytest
 
-from leanclient.base_client import BaseLeanLSPClient, LSPProtocolError
+from leanclient.base_client import (
+    BaseLeanLSPClient,
+    LSPProtocolError,
+    LSPResponseError,
+    _new_event_loop,
+)
 
 
 class InlineLoop:
@@ -31,6 +39,7 @@ def make_reader_client(stdout: bytes) -> BaseLeanLSPClient:
     client._futures = {}
     client._futures_lock = threading.Lock()
     client._reader_error = None
+    client._read_buffer = bytearray(16)
     client.request_id = 0
     return client
 
@@ -105,6 +114,14 @@ def test_read_stdout_message_accepts_additional_lsp_headers():
     assert client._read_stdout_message() == message
 
 
+@pytest.mark.unit
+def test_read_stdout_message_accepts_non_canonical_content_length():
+    """Header names are case-insensitive and may carry extra whitespace."""
+    client = make_reader_client(b"content-length :  2 \r\n\r\n{}")
+
+    assert client._read_stdout_message() == {}
+
+
 @pytest.mark.unit
 @pytest.mark.parametrize(
     ("stdout", "error"),
@@ -115,6 +132,10 @@ def test_read_stdout_message_accepts_additional_lsp_headers():
             b"Content-Length: 2\r\nContent-Length: 2\r\n\r\n{}",
             "Duplicate LSP header",
         ),
+        (
+            b"Content-Length: 2\r\ncontent-length: 2\r\n\r\n{}",
+            "Duplicate LSP header",
+        ),
         (b"Content-Length: nope\r\n\r\n", "Invalid Content-Length"),
         (b"Content-Length: -1\r\n\r\n", "Invalid Content-Length"),
         (b"Content-Length: +2\r\n\r\n{}", "Invalid Content-Length"),
@@ -188,3 +209,128 @@ def test_truncated_lsp_body_fails_with_byte_counts():
 
     with pytest.raises(LSPProtocolError, match="expected 5 bytes, got 2"):
         client._read_stdout_message()
+
+
+@pytest.mark.unit
+def test_read_stdout_message_reuses_body_buffer_across_sizes():
+    """Messages larger and smaller than the body buffer parse independently."""
+    large = {"jsonrpc": "2.0", "id": 1, "result": {"blob": "x" * 100}}
+    small = {"jsonrpc": "2.0", "id": 2, "result": None}
+    client = make_reader_client(
+        make_lsp_frame(orjson.dumps(large)) + make_lsp_frame(orjson.dumps(small))
+    )
+
+    assert client._read_stdout_message() == large
+    assert client._read_stdout_message() == small
+
+
+@pytest.mark.unit
+def test_error_response_carries_error_object():
+    """Error responses fail the future with the raw JSON-RPC error attached."""
+    error = {"code": -32602, "message": "invalid params"}
+    client = make_reader_client(
+        make_lsp_frame(orjson.dumps({"jsonrpc": "2.0", "id": 1, "error": error}))
+    )
+    client._notification_handlers = {}
+    client.enable_history = False
+    client._stdout_thread_stop_event = threading.Event()
+    future = client._loop.create_future()
+    client._futures[1] = future
+
+    client._read_stdout_loop(client._stdout_thread_stop_event)
+
+    exc = future.exception()
+    assert isinstance(exc, LSPResponseError)
+    assert exc.error == error
+    assert str(exc) == f"LSP Error: {error}"
+
+
+@pytest.mark.unit
+def test_private_loop_uses_uvloop_when_installed(monkeypatch):
+    created = []
+
+    def new_event_loop():
+        loop = asyncio.new_event_loop()
+        created.append(loop)
+        return loop
+
+    monkeypatch.setitem(
+        sys.modules, "uvloop", types.SimpleNamespace(new_event_loop=new_event_loop)
+    )
+    loop = _new_event_loop()
+    assert created == [loop]
+    loop.close()
+
+
+@pytest.mark.unit
+@pytest.mark.parametrize("installed, use_uvloop", [(False, True), (True, False)])
+def test_private_loop_falls_back_to_asyncio(monkeypatch, installed, use_uvloop):
+    def new_event_loop():
+        raise AssertionError("uvloop must not be used")
+
+    uvloop = types.SimpleNamespace(new_event_loop=new_event_loop)
+    monkeypatch.setitem(sys.modules, "uvloop", uvloop if installed else None)
+    loop = _new_event_loop(use_uvloop)
+    assert isinstance(loop, asyncio.AbstractEventLoop)
+    loop.close()
+
+
+@pytest.mark.unit
+def test_write_messages_sends_one_flushed_write():
+    class RecordingPipe(io.BytesIO):
+        writes = 0
+        flushes = 0
+
+        def write(self, data):
+            self.writes += 1
+            return super().write(data)
+
+        def flush(self):
+            self.flushes += 1
+
+    client = object.__new__(BaseLeanLSPClient)
+    client.stdin = RecordingPipe()
+    client._write_lock = threading.Lock()
+    client.enable_history = False
+
+    client._send_notifications("textDocument/didOpen", [{"n": 1}, {"n": 2}])
+
+    assert client.stdin.writes == 1
+    assert client.stdin.flushes == 1
+    reader = make_reader_client(client.stdin.getvalue())
+    assert reader._read_stdout_message()["params"] == {"n": 1}
+    assert reader._read_stdout_message()["params"] == {"n": 2}
+
+
+@pytest.mark.unit
+def test_send_requests_async_registers_all_before_one_write():
+    responses = make_lsp_frame(b'{"jsonrpc":"2.0","id":1,"result":"b"}') + (
+        make_lsp_frame(b'{"jsonrpc":"2.0","id":0,"result":"a"}')
+    )
+    client = make_reader_client(responses)
+    writes = []
+    client._write_messages = writes.append
+    client.enable_history = False
+
+    futures = client._send_requests_async(
+        [("textDocument/documentSymbol", {}), ("textDocument/foldingRange", {})]
+    )
+    assert [[m["id"] for m in batch] for batch in writes] == [[0, 1]]
+
+    client._read_stdout_loop(threading.Event())
+    assert [f.result() for f in futures] == ["a", "b"]
+
+
+@pytest.mark.unit
+def test_server_request_does_not_resolve_pending_future_with_same_id():
+    client = make_reader_client(
+        make_lsp_frame(b'{"jsonrpc":"2.0","id":0,"method":"window/showDocument"}')
+        + make_lsp_frame(b'{"jsonrpc":"2.0","id":0,"result":"mine"}')
+    )
+    client._write_messages = lambda messages: None
+    client.enable_history = False
+    client._notification_handlers = {}
+
+    future = client._send_request_async("textDocument/hover", {})
+    client._read_stdout_loop(threading.Event())
+    assert future.result() == "mine"
@@ -0,0 +1,357 @@
+"""Unit tests for LeanLSPClient request plumbing (no Lean server)."""
+
+import threading
+import time
+
+import pytest
+
+from leanclient.client import LeanLSPClient
+from leanclient.file_manager import FATAL_ERROR_MESSAGE, FileState
+from leanclient.utils import SemanticTokenProcessor
+
+pytestmark = pytest.mark.unit
+
+
+def make_client(sent: list) -> LeanLSPClient:
+    """Create a client shell whose requests are recorded instead of sent."""
+    client = object.__new__(LeanLSPClient)
+    client.opened_files = {}
+    client._opened_files_lock = threading.Lock()
+    client._shared_requests = {}
+    client.token_processor = SemanticTokenProcessor(["keyword", "variable"])
+
+    def send_request(path, method, params, timeout=30.0):
+        sent.append((path, method, params))
+        return {"data": [0, 0, 3, 0, 0, 0, 4, 2, 1, 0]}
+
+    client._send_request = send_request
+    return client
+
+
+def test_semantic_tokens_cached_for_processed_version():
+    sent = []
+    client = make_client(sent)
+    state = FileState(uri="file:///A.lean", content="def x := 1", complete=True)
+    client.opened_files["A.lean"] = state
+
+    first = client.get_semantic_tokens("A.lean")
+    assert first == [[0, 0, 3, "keyword"], [0, 4, 2, "variable"]]
+    first[0][3] = "mutated by caller"
+    second = client.get_semantic_tokens("A.lean")
+    assert second == [[0, 0, 3, "keyword"], [0, 4, 2, "variable"]]
+    second[1].append("mutated by caller")
+    assert client.get_semantic_tokens("A.lean")[1] == [0, 4, 2, "variable"]
+    assert len(sent) == 1
+
+    state.version += 1
+    state.reset_after_change()
+    client.get_semantic_tokens("A.lean")
+    assert len(sent) == 2
+
+
+def test_semantic_tokens_not_cached_while_processing():
+    sent = []
+    client = make_client(sent)
+    client.opened_files["A.lean"] = FileState(uri="file:///A.lean", content="")
+
+    client.get_semantic_tokens("A.lean")
+    client.get_semantic_tokens("A.lean")
+    assert len(sent) == 2
+
+
+def test_semantic_tokens_as_array_shares_cache():
+    np = pytest.importorskip("numpy")
+    sent = []
+    client = make_client(sent)
+    state = FileState(uri="file:///A.lean", content="def x := 1", complete=True)
+    client.opened_files["A.lean"] = state
+
+    tokens = client.get_semantic_tokens("A.lean", as_array=True)
+    np.testing.assert_array_equal(tokens, [[0, 0, 3, 0], [0, 4, 2, 1]])
+    assert client.get_semantic_tokens("A.lean") == [
+        [0, 0, 3, "keyword"],
+        [0, 4, 2, "variable"],
+    ]
+    client.get_semantic_tokens("A.lean", as_array=True)
+    assert len(sent) == 1
+
+
+def test_position_responses_cached_for_processed_version():
+    sent = []
+    client = make_client(sent)
+    state = FileState(uri="file:///A.lean", content="def x := 1", complete=True)
+    client.opened_files["A.lean"] = state
+
+    first = client.get_hover("A.lean", 0, 4)
+    first["data"] = "mutated by caller"
+    assert client.get_hover("A.lean", 0, 4)["data"] == [0, 0, 3, 0, 0, 0, 4, 2, 1, 0]
+    client.get_hover("A.lean", 0, 5)
+    assert len(sent) == 2
+
+    state.version += 1
+    state.reset_after_change()
+    client.get_hover("A.lean", 0, 4)
+    client.get_hover("A.lean", 0, 4)
+    assert len(sent) == 4
+
+
+def test_concurrent_identical_position_requests_share_one_call():
+    sent = []
+    client = make_client(sent)
+    client.opened_files["A.lean"] = FileState(uri="file:///A.lean", content="")
+    send_request = client._send_request
+
+    def send_request_once_joined(*args, **kwargs):
+        (shared,) = client._shared_requests.values()
+        while not shared.joined:
+            time.sleep(0.001)
+        return send_request(*args, **kwargs)
+
+    client._send_request = send_request_once_joined
+    results = []
+    threads = [
+        threading.Thread(target=lambda: results.append(client.get_goal("A.lean", 1, 2)))
+        for _ in range(2)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join(5)
+
+    assert len(sent) == 1
+    assert results[0] == results[1]
+    assert results[0] is not results[1]
+    assert client._shared_requests == {}
+
+
+def test_retry_backs_off_exponentially(monkeypatch):
+    sleeps = []
+    monkeypatch.setattr("leanclient.file_manager.time.sleep", sleeps.append)
+    monkeypatch.setattr("leanclient.file_manager.random.uniform", lambda a, b: b)
+    client = make_client([])
+
+    client._send_request_retry(
+        "A.lean", "textDocument/references", {}, max_retries=6, retry_delay=0.1
+    )
+    assert sleeps == pytest.approx([0.1, 0.2, 0.4, 0.8, 1.0, 1.0])
+
+    sleeps.clear()
+    client._send_request_retry(
+        "A.lean", "textDocument/references", {}, 3, 0.1, max_delay=0.15
+    )
+    assert sleeps == pytest.approx([0.1, 0.15, 0.15])
+
+
+def test_code_actions_use_supplied_diagnostics():
+    sent = []
+    client = make_client(sent)
+
+    def fail(*args, **kwargs):
+        raise AssertionError("diagnostics were supplied")
+
+    client.get_diagnostics = fail
+    in_range = {"range": {"start": {"line": 2}, "end": {"line": 2}}}
+    elsewhere = {"range": {"start": {"line": 9}, "end": {"line": 9}}}
+
+    client.get_code_actions("A.lean", 1, 0, 3, 0, diagnostics=[in_range, elsewhere])
+    _, method, params = sent[-1]
+    assert method == "textDocument/codeAction"
+    assert params["context"]["diagnostics"] == [in_range]
+
+
+def test_code_actions_read_pushed_diagnostics():
+    sent = []
+    client = make_client(sent)
+    in_range = {"range": {"start": {"line": 2}, "end": {"line": 2}}}
+    client.opened_files["A.lean"] = FileState(
+        uri="file:///A.lean", content="", complete=True, diagnostics=[in_range]
+    )
+
+    def fail(*args, **kwargs):
+        raise AssertionError("pushed diagnostics are already available")
+
+    client.get_diagnostics = fail
+
+    client.get_code_actions("A.lean", 1, 0, 3, 0)
+    assert sent[-1][2]["context"]["diagnostics"] == [in_range]
+
+
+def test_code_actions_wait_for_slow_file_before_requiring_diagnostics():
+    sent = []
+    client = make_client(sent)
+    in_range = {"range": {"start": {"line": 2}, "end": {"line": 2}}}
+    state = FileState(uri="file:///A.lean", content="")
+    client.opened_files["A.lean"] = state
+    waits = []
+
+    def wait_for_diagnostics(uris, inactivity_timeout=15.0, max_timeout=300.0):
+        waits.append(inactivity_timeout)
+        state.diagnostics = [in_range]  # arrives while still processing
+        state.complete = True
+        return True
+
+    client._wait_for_diagnostics = wait_for_diagnostics
+
+    client.get_code_actions("A.lean", 1, 0, 3, 0, require_diagnostics=True)
+    assert waits == [15.0]
+    assert sent[-1][2]["context"]["diagnostics"] == [in_range]
+
+
+@pytest.mark.parametrize(
+    ("error", "fatal_error", "expected"),
+    [
+        ({"message": "rpc failed"}, False, [{"message": "rpc failed"}]),
+        (None, True, [{"message": FATAL_ERROR_MESSAGE}]),
+    ],
+)
+def test_code_actions_report_error_placeholders(error, fatal_error, expected):
+    sent = []
+    client = make_client(sent)
+    client.opened_files["A.lean"] = FileState(
+        uri="file:///A.lean",
+        content="",
+        complete=True,
+        error=error,
+        fatal_error=fatal_error,
+    )
+
+    client.get_code_actions("A.lean", 0, 0, 3, 0)
+    assert sent[-1][2]["context"]["diagnostics"] == expected
+
+
+def test_code_actions_can_skip_ranges_without_diagnostics():
+    sent = []
+    client = make_client(sent)
+    elsewhere = {"range": {"start": {"line": 9}, "end": {"line": 9}}}
+
+    actions = client.get_code_actions(
+        "A.lean", 1, 0, 3, 0, diagnostics=[elsewhere], require_diagnostics=True
+    )
+    assert actions == []
+    assert sent == []
+
+
+def test_call_hierarchy_skips_wait_for_processed_file():
+    sent = []
+    client = make_client(sent)
+    client.opened_files["A.lean"] = FileState(
+        uri="file:///A.lean", content="", complete=True
+    )
+
+    def fail(*args, **kwargs):
+        raise AssertionError("file is already processed")
+
+    client.get_diagnostics = fail
+    client._wait_for_diagnostics = fail
+
+    client.get_call_hierarchy_items("A.lean", 0, 0)
+    assert sent[-1][1] == "textDocument/prepareCallHierarchy"
+
+
+@pytest.mark.parametrize(
+    "edit_key",
+    ["changes", "documentChanges", "data"],
+)
+def test_code_action_resolve_opens_target_file(tmp_path, edit_key):
+    client = make_client([])
+    client.project_path = tmp_path.resolve()
+    uri = (tmp_path.resolve() / "src" / "B.lean").as_uri()
+    action = {
+        "changes": {"edit": {"changes": {uri: []}}},
+        "documentChanges": {
+            "edit": {"documentChanges": [{"textDocument": {"uri": uri}, "edits": []}]}
+        },
+        "data": {"data": {"params": {"textDocument": {"uri": uri}}}},
+    }[edit_key]
+    opened = []
+    client.open_file = opened.append
+    client._send_request_sync = lambda method, params: {"title": "resolved"}
+
+    assert client.get_code_action_resolve(action) == {"title": "resolved"}
+    assert opened == ["src/B.lean"]
+
+    client.opened_files["src/B.lean"] = FileState(uri=uri, content="")
+    client.get_code_action_resolve(action)
+    assert opened == ["src/B.lean"]
+
+
+@pytest.mark.parametrize("eager_open", [False, True])
+def test_file_client_eager_open(tmp_path, eager_open):
+    (tmp_path / "A.lean").write_text("def x := 1")
+    client = make_client([])
+    client.project_path = tmp_path
+    opened = []
+    client.open_file = opened.append
+
+    client.create_file_client("A.lean", eager_open=eager_open)
+    assert opened == (["A.lean"] if eager_open else [])
+
+
+def test_file_client_passes_as_array(tmp_path):
+    np = pytest.importorskip("numpy")
+    (tmp_path / "A.lean").write_text("def x := 1")
+    client = make_client([])
+    client.project_path = tmp_path
+    client.opened_files["A.lean"] = FileState(uri="file:///A.lean", content="")
+
+    tokens = client.create_file_client("A.lean").get_semantic_tokens(as_array=True)
+    np.testing.assert_array_equal(tokens, [[0, 0, 3, 0], [0, 4, 2, 1]])
+
+
+def test_close_files_sends_all_didclose_together():
+    client = make_client([])
+    client._recently_closed = set()
+    client._rpc_sessions = {"file:///A.lean": "session"}
+    for name in ("A", "B"):
+        client.opened_files[f"{name}.lean"] = FileState(
+            uri=f"file:///{name}.lean", content=""
+        )
+    batches = []
+    client._send_notifications = lambda method, params: batches.append((method, params))
+
+    client.close_files(["A.lean", "B.lean"], blocking=False)
+    assert batches == [
+        (
+            "textDocument/didClose",
+            [
+                {"textDocument": {"uri": "file:///A.lean"}},
+                {"textDocument": {"uri": "file:///B.lean"}},
+            ],
+        )
+    ]
+    assert client.opened_files == {}
+    assert client._rpc_sessions == {}
+
+
+def test_wait_timeout_targets_grace_period_expiry():
+    client = make_client([])
+    state = FileState(uri="file:///A.lean", content="", processing=False)
+    state.last_activity = 100.0
+    client.opened_files["A.lean"] = state
+    pending = {"file:///A.lean"}
+    path_by_uri = {"file:///A.lean": "A.lean"}
+
+    timeout = client._wait_timeout(pending, path_by_uri, 100.1, deadline=150.0)
+    assert timeout == pytest.approx(0.4)
+
+    state.wait_for_diag_done = True  # readiness no longer depends on the clock
+    timeout = client._wait_timeout(pending, path_by_uri, 100.1, deadline=100.3)
+    assert timeout == pytest.approx(0.2)
+
+
+def test_open_new_files_registers_nothing_if_a_read_fails(tmp_path):
+    (tmp_path / "A.lean").write_text("def x := 1")
+    client = make_client([])
+    client.project_path = tmp_path
+    client._recently_closed = set()
+    batches = []
+    client._send_notifications = lambda method, params: batches.append(params)
+
+    with pytest.raises(FileNotFoundError):
+        client._open_new_files(["A.lean", "Missing.lean"])
+    assert client.opened_files == {}
+    assert batches == []
+
+    client._open_new_files(["A.lean"])
+    assert list(client.opened_files) == ["A.lean"]
+    assert [p["textDocument"]["text"] for p in batches[0]] == ["def x := 1"]
@@ -0,0 +1,32 @@
+"""Unit tests for the top-level package namespace."""
+
+import subprocess
+import sys
+
+import pytest
+
+import leanclient
+
+pytestmark = pytest.mark.unit
+
+
+def test_import_does_not_load_pool():
+    code = (
+        "import sys, leanclient; "
+        "assert 'leanclient.pool' not in sys.modules; "
+        "assert 'tqdm' not in sys.modules"
+    )
+    subprocess.run([sys.executable, "-c", code], check=True)
+
+
+def test_lazy_exports_resolve():
+    from leanclient.pool import LeanClientPool
+
+    assert leanclient.LeanClientPool is LeanClientPool
+    for name in leanclient.__all__:
+        assert getattr(leanclient, name) is not None
+    assert not hasattr(leanclient, "NotAThing")
+
+
+def test_dir_lists_every_export():
+    assert set(leanclient.__all__) <= set(dir(leanclient))
@@ -4,10 +4,14 @@ import pytest
 
 from leanclient.utils import (
     DocumentContentChange,
-    _utf16_pos_to_utf8_pos,
+    SemanticTokenProcessor,
+    _index_from_line_character,
+    _index_in_line,
     apply_changes_to_text,
+    experimental,
     needs_mathlib_cache_get,
     normalize_newlines,
+    read_source_file,
 )
 
 
@@ -17,6 +21,29 @@ def test_normalize_crlf_to_lf():
     assert normalize_newlines("a\r\nb\r\nc") == "a\nb\nc"
 
 
+@pytest.mark.unit
+def test_read_source_file_matches_text_mode(tmp_path):
+    path = tmp_path / "A.lean"
+    path.write_bytes("a\r\nβ\rc\n\r\n".encode())
+    with open(path, encoding="utf-8") as f:
+        expected = f.read()
+    assert read_source_file(path) == expected == "a\nβ\nc\n\n"
+
+
+@pytest.mark.unit
+def test_experimental_warns_once(caplog):
+    class Api:
+        @experimental
+        def method(self, x):
+            return x
+
+    api = Api()
+    with caplog.at_level("WARNING", logger="leanclient"):
+        assert [api.method(i) for i in range(3)] == [0, 1, 2]
+    assert len(caplog.records) == 1
+    assert "method() is experimental" in caplog.records[0].getMessage()
+
+
 @pytest.mark.unit
 def test_normalize_already_lf():
     assert normalize_newlines("hello\nworld") == "hello\nworld"
@@ -29,32 +56,31 @@ def test_normalize_no_newlines():
 
 @pytest.mark.unit
 def test_utf16_pos_ascii_only():
-    """ASCII characters are 1 UTF-16 code unit and 1 UTF-8 byte."""
+    """ASCII characters are 1 UTF-16 code unit and 1 code point."""
     text = "hello\nworld"
     # Line 0, char 2 should be the 'l' in "hello"
-    assert _utf16_pos_to_utf8_pos(text, 0, 2) == 2
+    assert _index_from_line_character(text, 0, 2) == 2
     # Line 1, char 3 should be the 'l' in "world"
-    assert _utf16_pos_to_utf8_pos(text, 1, 3) == 9  # 6 bytes for "hello\n" + 3
+    assert _index_from_line_character(text, 1, 3) == 9  # 6 for "hello\n" + 3
 
 
 @pytest.mark.unit
 def test_utf16_pos_unicode_bmp():
-    """Unicode chars in BMP are 1 UTF-16 code unit but may be >1 UTF-8 byte."""
+    """Unicode chars in BMP are 1 UTF-16 code unit and 1 code point."""
     text = "hełło\nworld"  # ł is U+0142, in BMP
-    # Line 0, char 4 should be after "hełł"
-    # "hełło" = 'h'(1) + 'e'(1) + 'ł'(2 UTF-8) + 'ł'(2 UTF-8) + 'o'(1) = 7 UTF-8 bytes
-    # But in UTF-16: 'h'(1) + 'e'(1) + 'ł'(1) + 'ł'(1) + 'o'(1) = 5 code units
-    assert _utf16_pos_to_utf8_pos(text, 0, 4) == 6  # After "hełł" in UTF-8
+    assert _index_from_line_character(text, 0, 4) == 4  # After "hełł"
+    assert _index_in_line(text, 0, 4) == 4
 
 
 @pytest.mark.unit
 def test_utf16_pos_emoji_surrogate_pair():
     """Emoji outside BMP need 2 UTF-16 code units (surrogate pair)."""
-    text = "hi😀"  # 😀 is U+1F600, needs surrogate pair in UTF-16
-    # UTF-16: 'h'(1) + 'i'(1) + '😀'(2) = 4 code units
-    # UTF-8: 'h'(1) + 'i'(1) + '😀'(4) = 6 bytes
-    assert _utf16_pos_to_utf8_pos(text, 0, 2) == 2  # After "hi"
-    assert _utf16_pos_to_utf8_pos(text, 0, 4) == 6  # After "hi😀"
+    text = "ab\nhi😀!"  # 😀 is U+1F600, needs surrogate pair in UTF-16
+    # UTF-16: 'h'(1) + 'i'(1) + '😀'(2) = 4 code units, but 3 code points
+    assert _index_in_line(text, 3, 2) == 5  # After "hi"
+    assert _index_in_line(text, 3, 4) == 6  # After "hi😀"
+    # An offset inside the surrogate pair includes the whole character
+    assert _index_in_line(text, 3, 3) == 6
 
 
 @pytest.mark.unit
@@ -62,22 +88,23 @@ def test_utf16_pos_character_beyond_line_length():
     """LSP accepts character positions beyond line length liberally."""
     text = "short\nline"
     # Line 0 has 5 chars, but asking for position 100 should clamp to end of line
-    assert _utf16_pos_to_utf8_pos(text, 0, 100) == 5  # End of "short"
-    assert _utf16_pos_to_utf8_pos(text, 0, 100000) == 5  # Still end of "short"
+    assert _index_from_line_character(text, 0, 100) == 5  # End of "short"
+    assert _index_from_line_character(text, 0, 100000) == 5  # Still end of "short"
+    assert _index_from_line_character("sh😀\n", 0, 100) == 3
 
 
 @pytest.mark.unit
 def test_utf16_pos_negative_line():
     """Negative line numbers should clamp to 0."""
     text = "hello\nworld"
-    assert _utf16_pos_to_utf8_pos(text, -1, 0) == 0
+    assert _index_from_line_character(text, -1, 0) == 0
 
 
 @pytest.mark.unit
 def test_utf16_pos_line_beyond_file():
     """Line numbers beyond file should return file length."""
     text = "hello\nworld"
-    assert _utf16_pos_to_utf8_pos(text, 100, 0) == len(text)
+    assert _index_from_line_character(text, 100, 0) == len(text)
 
 
 @pytest.mark.unit
@@ -100,6 +127,15 @@ def test_document_change_ranged_change():
     assert not change.is_full_change()
 
 
+@pytest.mark.unit
+def test_document_change_has_no_instance_dict():
+    """Test that changes are slotted and stay immutable."""
+    change = DocumentContentChange("text", [0, 0], [0, 4])
+    assert not hasattr(change, "__dict__")
+    with pytest.raises(AttributeError):
+        change.text = "other"
+
+
 @pytest.mark.unit
 def test_document_change_invalid_range_single_position():
     """Range must be None or a pair of [line, char] positions."""
@@ -161,6 +197,17 @@ def test_apply_multiline_replacement():
     assert result == "line1\nNEW\nSTUFF\nline4"
 
 
+@pytest.mark.unit
+def test_apply_change_counts_utf16_units_and_clamps_past_end():
+    original = "a😀b\nαβγ\nend"
+    changes = [
+        DocumentContentChange("X", [0, 3], [1, 1]),
+        DocumentContentChange("!", [5, 0], [9, 0]),
+    ]
+    result = apply_changes_to_text(original, changes)
+    assert result == "a😀Xβγ\nend!"
+
+
 @pytest.mark.unit
 def test_apply_empty_changes():
     original = "unchanged"
@@ -204,6 +251,47 @@ def test_apply_ranged_change_after_unicode_on_prior_line():
 # ============================================================================
 
 
+SEMANTIC_TOKENS_RAW = [
+    # d_line, d_char, length, type, modifiers
+    *(1, 0, 7, 0, 0),
+    *(0, 8, 3, 1, 0),
+    *(0, 4, 1, 1, 0),
+    *(2, 2, 5, 0, 0),
+    *(0, 6, 2, 1, 0),
+]
+
+
+@pytest.mark.unit
+def test_semantic_tokens_decode():
+    processor = SemanticTokenProcessor(["keyword", "variable"])
+    assert processor(SEMANTIC_TOKENS_RAW) == [
+        [1, 0, 7, "keyword"],
+        [1, 8, 3, "variable"],
+        [1, 12, 1, "variable"],
+        [3, 2, 5, "keyword"],
+        [3, 8, 2, "variable"],
+    ]
+
+
+@pytest.mark.unit
+def test_semantic_tokens_decode_array_matches_lists():
+    np = pytest.importorskip("numpy")
+    processor = SemanticTokenProcessor(["keyword", "variable"])
+    arr = processor.decode_array(SEMANTIC_TOKENS_RAW)
+    assert arr.shape == (5, 4)
+    assert arr.dtype == np.int32
+    assert [
+        [line, char, length, processor.token_types[t]]
+        for line, char, length, t in arr.tolist()
+    ] == processor(SEMANTIC_TOKENS_RAW)
+    # Leading tokens on line 0 accumulate from column 0.
+    assert processor.decode_array([0, 3, 1, 0, 0, 0, 2, 1, 1, 0]).tolist() == [
+        [0, 3, 1, 0],
+        [0, 5, 1, 1],
+    ]
+    assert processor.decode_array([]).shape == (0, 4)
+
+
 @pytest.mark.unit
 def test_needs_mathlib_cache_get_no_manifest(tmp_path):
     """Test when no lake-manifest.json exists - no cache needed."""
@@ -24,6 +24,10 @@ def test_normalize_local_path_uses_forward_slashes() -> None:
         BaseLeanLSPClient._normalize_local_path(r"src\Unicode.lean")
         == "src/Unicode.lean"
     )
+    assert (
+        BaseLeanLSPClient._normalize_local_path("src/My%20File.lean")
+        == "src/My File.lean"
+    )
 
 
 def test_uri_to_local_uses_forward_slashes(tmp_path: Path) -> None:
@@ -38,19 +42,30 @@ def test_uri_to_local_uses_forward_slashes(tmp_path: Path) -> None:
     assert client._uri_to_local(target.resolve().as_uri()) == "src/Unicode.lean"
 
 
+def test_uri_conversions_are_memoized(tmp_path: Path) -> None:
+    client = object.__new__(BaseLeanLSPClient)
+    client.project_path = tmp_path.resolve()
+
+    uri = client._local_to_uri(r"src\Cached.lean")
+    assert uri == (tmp_path.resolve() / "src" / "Cached.lean").as_uri()
+    assert client._local_to_uri("src/Cached.lean") is uri
+    assert client._uri_to_local(uri) == "src/Cached.lean"
+    assert client._uri_to_local(uri) is client._uri_to_local(uri)
+
+
 def test_open_new_files_reads_utf8(
     monkeypatch: pytest.MonkeyPatch, tmp_path: Path
 ) -> None:
     lean_file = tmp_path / "Unicode.lean"
     lean_file.write_text("theorem test : ℕ → ℕ := id\n", encoding="utf-8")
 
-    recorded: dict[str, str | None] = {}
+    recorded: dict[str, str] = {}
 
     def recording_open(file, mode="r", *args, **kwargs):
-        recorded["encoding"] = kwargs.get("encoding")
+        recorded["mode"] = mode
         return builtins.open(file, mode, *args, **kwargs)
 
-    monkeypatch.setattr("leanclient.file_manager.open", recording_open, raising=False)
+    monkeypatch.setattr("leanclient.utils.open", recording_open, raising=False)
 
     manager = object.__new__(LSPFileManager)
     manager.opened_files = {}
@@ -58,11 +73,12 @@ def test_open_new_files_reads_utf8(
     manager._recently_closed = set()
     manager._locals_to_uris = lambda _paths: [lean_file.resolve().as_uri()]
     manager._uri_to_abs = lambda _uri: lean_file
-    manager._send_notification = lambda *_args, **_kwargs: None
+    manager._send_notifications = lambda *_args, **_kwargs: None
 
     manager._open_new_files(["src/Unicode.lean"])
 
-    assert recorded["encoding"] == "utf-8"
+    # Binary read + explicit UTF-8 decode: independent of the locale encoding.
+    assert recorded["mode"] == "rb"
     assert manager.opened_files["src/Unicode.lean"].content == (
         "theorem test : ℕ → ℕ := id\n"
     )
@@ -112,6 +128,7 @@ def test_aio_uri_roundtrip(tmp_path: Path) -> None:
 
     assert uri == (tmp_path / "src" / "Unicode.lean").as_uri()
     assert client._uri_to_relpath(uri) == str(Path("src/Unicode.lean"))
+    assert client._uri_to_relpath(uri) is client._uri_to_relpath(uri)
 
 
 def test_aio_uri_to_abs_restores_windows_drive(